@@ -0,0 +1,40 @@
+"""Add integer peer IP column to bgp_peerings
+
+Revision ID: 002_add_peer_ip_int
+Revises: 001_add_anomalies
+Create Date: 2024-02-01 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002_add_peer_ip_int'
+down_revision = '001_add_anomalies'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'bgp_peerings',
+        sa.Column(
+            'peer_ip_int',
+            sa.BigInteger(),
+            nullable=True,
+            comment='Peer IPv4 address as an unsigned 32-bit integer (NULL for IPv6)',
+        ),
+    )
+    op.create_index('ix_bgp_peerings_peer_ip_int', 'bgp_peerings', ['peer_ip_int'], unique=False)
+
+    # Backfill existing IPv4 peers; inet subtraction yields the address as bigint
+    op.execute("""
+        UPDATE bgp_peerings
+        SET peer_ip_int = peer_ip::inet - '0.0.0.0'::inet
+        WHERE family(peer_ip::inet) = 4
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bgp_peerings_peer_ip_int', table_name='bgp_peerings')
+    op.drop_column('bgp_peerings', 'peer_ip_int')
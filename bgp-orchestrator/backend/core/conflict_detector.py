@@ -24,10 +24,10 @@ from typing import Any
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from ..models.peering import BGPPeering
+    from models.peering import BGPPeering
 else:
-    # Runtime import using relative import
-    from ..models.peering import BGPPeering  # noqa: F401
+    # Runtime import from the installed backend packages
+    from models.peering import BGPPeering  # noqa: F401
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +19,9 @@ from sqlalchemy import (
     func,
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
+
+from utils.validators import validate_ipv4_address_int
 
 Base = declarative_base()
 
@@ -45,6 +47,12 @@ class BGPPeering(Base):
     local_asn = Column(BigInteger, nullable=False, index=True, comment="Local ASN")
     peer_asn = Column(BigInteger, nullable=False, index=True, comment="Peer ASN")
     peer_ip = Column(String(45), nullable=False, comment="Peer IP address (IPv4 or IPv6)")
+    peer_ip_int = Column(
+        BigInteger,
+        nullable=True,
+        index=True,
+        comment="Peer IPv4 address as an unsigned 32-bit integer (NULL for IPv6)",
+    )
     hold_time = Column(Integer, nullable=False, comment="BGP hold time in seconds")
     keepalive = Column(Integer, nullable=False, comment="BGP keepalive interval in seconds")
 
@@ -115,6 +123,15 @@ class BGPPeering(Base):
         Index("idx_peering_local_asn", "local_asn"),
     )
 
+    @validates("peer_ip")
+    def _sync_peer_ip_int(self, key: str, value: str) -> str:
+        """Store the integer form of IPv4 peer addresses alongside the string."""
+        try:
+            self.peer_ip_int = validate_ipv4_address_int(value)
+        except ValueError:
+            self.peer_ip_int = None
+        return value
+
     def __repr__(self) -> str:
         """String representation of the model."""
         return f"<BGPPeering(id={self.id}, name='{self.name}', peer_ip='{self.peer_ip}', status='{self.status}')>"
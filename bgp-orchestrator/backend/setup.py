@@ -0,0 +1,16 @@
+"""
+Build script for the optional C extensions.
+
+Project metadata lives in pyproject.toml. utils/_radix.pyx is compiled
+when Cython is available; RadixTree falls back to pure Python otherwise.
+"""
+from setuptools import setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize(["utils/_radix.pyx"], language_level=3)
+
+setup(ext_modules=ext_modules)
@@ -0,0 +1,184 @@
+"""
+Unit tests for radix tree prefix lookup.
+"""
+from utils import radix_tree
+from utils.radix_tree import RadixTree
+
+
+def build_tree() -> RadixTree:
+    """Build a tree with nested IPv4 prefixes."""
+    tree = RadixTree()
+    tree.insert("0.0.0.0/0", "default")
+    tree.insert("10.0.0.0/8", "ten")
+    tree.insert("10.1.0.0/16", "ten-one")
+    tree.insert("10.1.2.0/24", "ten-one-two")
+    tree.insert("192.0.2.1/32", "host")
+    return tree
+
+
+def test_insert_and_search():
+    """Test exact prefix search."""
+    tree = build_tree()
+    assert tree.search("10.1.0.0/16") == "ten-one"
+    assert tree.search("10.2.0.0/16") is None
+
+
+def test_len_and_iter():
+    """Test that length tracks inserts, overwrites and deletes."""
+    tree = build_tree()
+    assert len(tree) == 5
+
+    tree.insert("10.0.0.0/8", "ten-again")
+    assert len(tree) == 5
+
+    assert tree.delete("10.1.0.0/16")
+    assert not tree.delete("10.1.0.0/16")
+    assert len(tree) == 4
+    assert sorted(tree) == [
+        ("0.0.0.0/0", "default"),
+        ("10.0.0.0/8", "ten-again"),
+        ("10.1.2.0/24", "ten-one-two"),
+        ("192.0.2.1/32", "host"),
+    ]
+
+
+def test_delete_missing_prefix():
+    """Test that deleting a prefix that is not stored leaves the tree unchanged."""
+    tree = RadixTree()
+    tree.insert("10.0.0.0/8", "ten")
+    assert not tree.delete("10.0.0.0/9")
+    assert not tree.delete("10.0.0.0/8x")
+    assert len(tree) == 1
+    assert tree.search("10.0.0.0/8") == "ten"
+    assert tree.longest_prefix_match("10.1.2.3") == ("10.0.0.0/8", "ten")
+
+
+def test_longest_prefix_match_ipv4():
+    """Test longest prefix match picks the most specific IPv4 prefix."""
+    tree = build_tree()
+    assert tree.longest_prefix_match("10.1.2.3") == ("10.1.2.0/24", "ten-one-two")
+    assert tree.longest_prefix_match("10.1.9.9") == ("10.1.0.0/16", "ten-one")
+    assert tree.longest_prefix_match("10.200.0.1") == ("10.0.0.0/8", "ten")
+    assert tree.longest_prefix_match("192.0.2.1") == ("192.0.2.1/32", "host")
+    assert tree.longest_prefix_match("172.16.0.1") == ("0.0.0.0/0", "default")
+
+
+def test_longest_prefix_match_compiled_matches_bit_trie():
+    """Test that compile() does not change lookup results."""
+    tree = build_tree()
+    tree.insert("10.1.2.128/25", "ten-one-two-high")
+    addresses = ["10.1.2.3", "10.1.2.200", "10.1.9.9", "10.200.0.1", "192.0.2.1", "192.0.2.2"]
+    uncompiled = [tree.longest_prefix_match(address) for address in addresses]
+
+    tree.compile()
+    assert [tree.longest_prefix_match(address) for address in addresses] == uncompiled
+
+
+def test_longest_prefix_match_no_match():
+    """Test longest prefix match without a covering prefix."""
+    tree = RadixTree()
+    tree.insert("10.0.0.0/8", "ten")
+    assert tree.longest_prefix_match("11.0.0.1") is None
+
+
+def test_longest_prefix_match_below_long_prefix():
+    """Test lookups in a /16 that also holds a more specific prefix."""
+    tree = RadixTree()
+    tree.insert("10.0.0.0/8", "ten")
+    tree.insert("10.1.2.0/24", "ten-one-two")
+    tree.insert("192.0.2.0/24", "doc")
+    assert tree.longest_prefix_match("10.1.3.1") == ("10.0.0.0/8", "ten")
+    assert tree.longest_prefix_match("10.1.2.1") == ("10.1.2.0/24", "ten-one-two")
+    assert tree.longest_prefix_match("192.0.3.1") is None
+
+
+def test_longest_prefix_match_after_update():
+    """Test that updates after compile() are visible without recompiling."""
+    tree = build_tree()
+    tree.compile()
+    assert tree.longest_prefix_match("10.1.2.3") == ("10.1.2.0/24", "ten-one-two")
+
+    tree.insert("10.1.2.0/25", "ten-one-two-low")
+    assert tree.longest_prefix_match("10.1.2.3") == ("10.1.2.0/25", "ten-one-two-low")
+
+    tree.delete("10.1.2.0/25")
+    tree.delete("10.1.2.0/24")
+    assert tree.longest_prefix_match("10.1.2.3") == ("10.1.0.0/16", "ten-one")
+    # Lookups between updates walk the binary trie instead of rebuilding
+    assert not tree._compiled
+
+    tree.compile()
+    assert tree.longest_prefix_match("10.1.2.3") == ("10.1.0.0/16", "ten-one")
+
+
+def test_longest_prefix_match_poptrie():
+    """Test the poptrie lookup used when numba is not installed."""
+    tree = RadixTree(use_poptrie=True)
+    assert tree.longest_prefix_match("10.1.2.3") is None
+
+    for prefix, value in build_tree():
+        tree.insert(prefix, value)
+    tree.insert("10.1.2.128/25", "ten-one-two-high")
+    tree.compile()
+    assert tree.longest_prefix_match("10.1.2.3") == ("10.1.2.0/24", "ten-one-two")
+    assert tree.longest_prefix_match("10.1.2.200") == ("10.1.2.128/25", "ten-one-two-high")
+    assert tree.longest_prefix_match("10.200.0.1") == ("10.0.0.0/8", "ten")
+    assert tree.longest_prefix_match("192.0.2.1") == ("192.0.2.1/32", "host")
+    assert tree.longest_prefix_match("192.0.2.2") == ("0.0.0.0/0", "default")
+
+    tree.delete("0.0.0.0/0")
+    tree.compile()
+    assert tree.longest_prefix_match("172.16.0.1") is None
+
+
+def test_longest_prefix_match_without_extension(monkeypatch):
+    """Test the NumPy array lookup used when the C extension is not built."""
+    monkeypatch.setattr(radix_tree, "_radix", None)
+    tree = build_tree()
+    tree.compile()
+    assert tree.longest_prefix_match("10.1.2.3") == ("10.1.2.0/24", "ten-one-two")
+    assert tree.longest_prefix_match("10.200.0.1") == ("10.0.0.0/8", "ten")
+    assert tree.longest_prefix_match("192.0.2.1") == ("192.0.2.1/32", "host")
+
+
+def test_bulk_insert():
+    """Test bulk insert matches individual inserts."""
+    tree = RadixTree()
+    tree.insert("10.0.0.0/8", "old")
+    tree.bulk_insert(
+        [
+            ("10.1.2.0/24", "ten-one-two"),
+            ("10.0.0.0/8", "ten"),
+            ("10.1.0.0/16", "ten-one"),
+            ("peer-group-a", "not-a-prefix"),
+        ]
+    )
+    assert len(tree) == 4
+    assert tree.search("10.0.0.0/8") == "ten"
+    assert tree.search("peer-group-a") == "not-a-prefix"
+    assert tree.longest_prefix_match("10.1.2.3") == ("10.1.2.0/24", "ten-one-two")
+    assert tree.longest_prefix_match("10.1.3.3") == ("10.1.0.0/16", "ten-one")
+
+
+def test_insert_int():
+    """Test inserting integer-keyed prefixes."""
+    tree = RadixTree()
+    tree.insert_int(0x0A010203, 16, "ten-one")
+    tree.insert_int(0xC0000201, 32, "host")
+    assert tree.search("10.1.0.0/16") == "ten-one"
+    assert tree.longest_prefix_match("10.1.9.9") == ("10.1.0.0/16", "ten-one")
+    assert tree.longest_prefix_match("192.0.2.1") == ("192.0.2.1/32", "host")
+    assert len(tree) == 2
+
+
+def test_longest_prefix_match_string_keys():
+    """Test that non-IPv4 keys use character matching."""
+    tree = RadixTree()
+    tree.insert("abc", 1)
+    assert tree.longest_prefix_match("abcd") == ("abc", 1)
+
+    tree.insert("abd", 2)
+    tree.insert("a", 3)
+    assert tree.longest_prefix_match("abcd") == ("abc", 1)
+    assert tree.longest_prefix_match("abx") == ("a", 3)
+    assert tree.longest_prefix_match("x") is None
@@ -0,0 +1,70 @@
+"""
+Unit tests for BGP data validators.
+"""
+import pytest
+
+from utils.validators import (
+    validate_ipv4_address,
+    validate_ipv4_address_int,
+    validate_ipv4_prefix,
+    validate_ipv6_address,
+    validate_ipv6_prefix,
+)
+
+
+def test_validate_ipv4_prefix_normalises_host_bits():
+    """Test that host bits are masked off like ipaddress strict=False."""
+    assert validate_ipv4_prefix("192.0.2.0/24") == "192.0.2.0/24"
+    assert validate_ipv4_prefix("10.1.2.3/8") == "10.0.0.0/8"
+    assert validate_ipv4_prefix("10.1.2.3/08") == "10.0.0.0/8"
+    assert validate_ipv4_prefix("10.1.2.3/0") == "0.0.0.0/0"
+    assert validate_ipv4_prefix("10.1.2.3") == "10.1.2.3/32"
+
+
+@pytest.mark.parametrize(
+    "prefix",
+    ["256.0.0.0/8", "10.0.0.0/33", "010.0.0.0/8", "10.0.0/8", "10.0.0.0/8\n", "not-a-prefix"],
+)
+def test_validate_ipv4_prefix_invalid(prefix):
+    """Test that malformed prefixes are rejected."""
+    with pytest.raises(ValueError):
+        validate_ipv4_prefix(prefix)
+
+
+def test_validate_ipv4_address():
+    """Test IPv4 address validation."""
+    assert validate_ipv4_address("192.0.2.1") == "192.0.2.1"
+    with pytest.raises(ValueError):
+        validate_ipv4_address("192.0.2.256")
+
+
+def test_validate_ipv4_address_int():
+    """Test IPv4 address conversion to integer form."""
+    assert validate_ipv4_address_int("10.0.0.1") == 0x0A000001
+    assert validate_ipv4_address_int("255.255.255.255") == 0xFFFFFFFF
+    with pytest.raises(ValueError):
+        validate_ipv4_address_int("2001:db8::1")
+
+
+@pytest.mark.parametrize(
+    "validator",
+    [
+        validate_ipv4_address,
+        validate_ipv4_address_int,
+        validate_ipv6_address,
+        validate_ipv4_prefix,
+        validate_ipv6_prefix,
+    ],
+)
+@pytest.mark.parametrize("value", [["192.0.2.1"], {"ip": "192.0.2.1"}, None])
+def test_validators_reject_non_string_input(validator, value):
+    """Test that unhashable or missing input raises ValueError, not TypeError."""
+    with pytest.raises(ValueError):
+        validator(value)
+
+
+def test_validators_accept_integer_addresses():
+    """Test that integer input bypasses the cache and is still parsed."""
+    assert validate_ipv4_address(0xC0000201) == "192.0.2.1"
+    assert validate_ipv4_address_int(0xC0000201) == 0xC0000201
+    assert validate_ipv4_prefix(0xC0000201) == "192.0.2.1/32"
@@ -4,6 +4,7 @@ from .radix_tree import RadixTree
 from .validators import (
     validate_asn,
     validate_ipv4_address,
+    validate_ipv4_address_int,
     validate_ipv4_prefix,
     validate_ipv6_address,
     validate_ipv6_prefix,
@@ -15,6 +16,7 @@ __all__ = [
     "RadixTree",
     "validate_asn",
     "validate_ipv4_address",
+    "validate_ipv4_address_int",
     "validate_ipv4_prefix",
     "validate_ipv6_address",
     "validate_ipv6_prefix",
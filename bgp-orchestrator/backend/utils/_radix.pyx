@@ -0,0 +1,71 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+C-typed binary IPv4 trie used by RadixTree for longest prefix matching.
+
+build() converts the Python BitNode trie kept by RadixTree into CRadixNode
+objects once; longest_prefix_match() then walks them with typed attribute
+loads and integer comparisons only.
+"""
+from libc.stdint cimport uint32_t
+
+
+cdef class CRadixNode:
+    """Node in the compiled IPv4 trie."""
+
+    cdef public uint32_t key, mask
+    cdef public int prefixlen
+    cdef public CRadixNode left, right
+    cdef public object entry
+
+    def __init__(self, uint32_t key=0, int prefixlen=0, object entry=None):
+        cdef uint32_t all_ones = 0xFFFFFFFF
+        self.key = key
+        self.prefixlen = prefixlen
+        self.mask = all_ones << (32 - prefixlen) if prefixlen else 0
+        self.entry = entry
+
+
+def build(object bit_node, uint32_t key=0, int prefixlen=0):
+    """
+    Convert a BitNode trie into CRadixNode objects.
+
+    Args:
+        bit_node: Root of the BitNode trie
+        key: Network address of bit_node
+        prefixlen: Depth of bit_node
+
+    Returns:
+        Root CRadixNode of the compiled trie
+    """
+    cdef CRadixNode node = CRadixNode(key, prefixlen, bit_node.entry)
+    zero, one = bit_node.children
+    if zero is not None:
+        node.left = build(zero, key, prefixlen + 1)
+    if one is not None:
+        node.right = build(one, key | (<uint32_t>1 << (31 - prefixlen)), prefixlen + 1)
+    return node
+
+
+cpdef object longest_prefix_match(CRadixNode root, uint32_t ip):
+    """
+    Find the longest prefix covering an IPv4 address.
+
+    Args:
+        root: Root of a trie returned by build()
+        ip: IPv4 address as an unsigned 32-bit integer
+
+    Returns:
+        Tuple of (prefix, value) if found, None otherwise
+    """
+    cdef CRadixNode node = root
+    cdef object best = None
+    while node is not None:
+        if node.entry is not None and (ip & node.mask) == node.key:
+            best = node.entry
+        if node.prefixlen == 32:
+            break
+        if (ip >> (31 - node.prefixlen)) & 1:
+            node = node.right
+        else:
+            node = node.left
+    return best
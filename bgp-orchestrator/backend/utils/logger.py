@@ -5,6 +5,7 @@ import logging
 import sys
 from typing import Any
 
+import orjson
 import structlog
 
 
@@ -33,15 +34,18 @@ def setup_logging(log_level: str = "INFO", log_format: str = "json") -> None:
     ]
 
     if log_format == "json":
-        processors.append(structlog.processors.JSONRenderer())
+        # orjson renders straight to bytes, written to stdout without re-encoding
+        processors.append(structlog.processors.JSONRenderer(serializer=orjson.dumps))
+        logger_factory = structlog.BytesLoggerFactory()
     else:
         processors.append(structlog.processors.ConsoleRenderer())
+        logger_factory = structlog.PrintLoggerFactory()
 
     structlog.configure(
         processors=processors,
         wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
 
@@ -1,12 +1,114 @@
 """
 Efficient prefix lookup using radix tree (patricia trie).
 """
-from typing import Any, Iterator, Optional, Tuple
+import importlib.util
+import ipaddress
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# numpy and numba take a large share of a second to import, so they are only
+# loaded when compile() first builds the arrays; this module is imported by
+# every process that uses utils.
+_HAVE_NUMBA = importlib.util.find_spec("numba") is not None
+_lpm_kernel: Optional[Callable[..., int]] = None
+
+try:
+    from . import _radix
+except ImportError:  # pragma: no cover - the C extension is optional
+    _radix = None
+
+
+# First-level table entries with this bit set hold a trie node index for
+# addresses covered by a prefix longer than /16 (see RadixTree.compile()).
+_L1_NODE = -0x80000000
+_L1_NODE_MASK = 0x7FFFFFFF
+
+# (shift, mask) of each poptrie level: five 6-bit strides and a final 2-bit one
+_POPTRIE_STRIDES = ((26, 0x3F), (20, 0x3F), (14, 0x3F), (8, 0x3F), (2, 0x3F), (0, 0x3))
+
+
+def _lpm(
+    keys: "np.ndarray",
+    masks: "np.ndarray",
+    values: "np.ndarray",
+    left: "np.ndarray",
+    right: "np.ndarray",
+    ip: int,
+    node: int,
+    depth: int,
+) -> int:
+    """
+    Walk the flattened IPv4 trie and return the entry index of the longest match.
+
+    Args:
+        keys: Network address of each node
+        masks: Netmask of each node
+        values: Entry index stored on each node (-1 if none)
+        left: Index of the 0-bit child (-1 if none)
+        right: Index of the 1-bit child (-1 if none)
+        ip: IPv4 address as an unsigned 32-bit integer
+        node: Index of the node to start from
+        depth: Prefix length of the start node
+
+    Returns:
+        Entry index of the longest matching prefix, or -1 if nothing matches
+    """
+    best = -1
+    while node >= 0:
+        if values[node] >= 0 and (ip & masks[node]) == keys[node]:
+            best = values[node]
+        if depth == 32:
+            break
+        if (ip >> (31 - depth)) & 1:
+            node = right[node]
+        else:
+            node = left[node]
+        depth += 1
+    return best
+
+
+def _load_lpm() -> Callable[..., int]:
+    """Return _lpm, JIT-compiled with numba when it is installed (imported on first use)."""
+    global _lpm_kernel
+    if _lpm_kernel is None:
+        try:
+            from numba import njit
+        except ImportError:  # pragma: no cover - numba is optional
+            _lpm_kernel = _lpm
+        else:
+            _lpm_kernel = njit(cache=True)(_lpm)
+    return _lpm_kernel
+
+
+def _ipv4_to_int(address: str) -> Optional[int]:
+    """Convert a dotted-quad IPv4 address to an integer, or None if it is not one."""
+    try:
+        return int(ipaddress.IPv4Address(address))
+    except ValueError:
+        return None
+
+
+def _ipv4_prefix_to_int(prefix: str) -> Optional[Tuple[int, int]]:
+    """Convert an IPv4 CIDR prefix to (network, prefixlen), or None if it is not one."""
+    try:
+        network = ipaddress.IPv4Network(prefix, strict=False)
+    except ValueError:
+        return None
+    return int(network.network_address), network.prefixlen
+
+
+def _int_to_ipv4(address: int) -> str:
+    """Format an unsigned 32-bit integer as a dotted-quad IPv4 address."""
+    return f"{address >> 24}.{(address >> 16) & 0xFF}.{(address >> 8) & 0xFF}.{address & 0xFF}"
 
 
 class RadixNode:
     """Node in the radix tree."""
 
+    __slots__ = ("prefix", "value", "children", "is_leaf")
+
     def __init__(self, prefix: str = "", value: Any = None):
         self.prefix = prefix
         self.value = value
@@ -14,15 +116,129 @@ class RadixNode:
         self.is_leaf = value is not None
 
 
+class BitNode:
+    """Node in the binary IPv4 trie, indexed by the next address bit."""
+
+    __slots__ = ("children", "entry")
+
+    def __init__(self):
+        self.children: list[Optional["BitNode"]] = [None, None]
+        self.entry: Optional[Tuple[str, Any]] = None
+
+
+class PopNode:
+    """
+    Poptrie node covering one 6-bit stride of an IPv4 address.
+
+    Bit b of bitmap is set when slot b has a child node, which is stored at
+    children[popcount(bitmap & ((1 << b) - 1))]. Leaves are leaf-pushed and
+    run-length compressed: bit b of leafvec is set where the matching entry
+    changes, so the entry for slot b is leaves[popcount(leafvec & ((2 << b) - 1)) - 1].
+    """
+
+    __slots__ = ("bitmap", "children", "leafvec", "leaves")
+
+    def __init__(self):
+        self.bitmap = 0
+        self.children: list["PopNode"] = []
+        self.leafvec = 0
+        self.leaves: list[Optional[Tuple[str, Any]]] = []
+
+
+def _build_poptrie(
+    bit_node: BitNode, depth: int, inherited: Optional[Tuple[str, Any]]
+) -> PopNode:
+    """Build the poptrie node for the stride starting at bit_node."""
+    stride = min(6, 32 - depth)
+    slot_entries: list[Optional[Tuple[str, Any]]] = [None] * (1 << stride)
+    child_nodes: list[Optional[PopNode]] = [None] * (1 << stride)
+
+    # (node, depth within the stride, first slot covered, best entry so far)
+    stack = [(bit_node, 0, 0, inherited)]
+    while stack:
+        node, level, slot, best = stack.pop()
+        if level == stride and depth + stride < 32:
+            # The entry on a stride boundary belongs to the next level
+            child_nodes[slot] = _build_poptrie(node, depth + stride, best)
+            slot_entries[slot] = best
+            continue
+        if node.entry is not None:
+            best = node.entry
+        if level == stride:
+            slot_entries[slot] = best
+            continue
+
+        span = 1 << (stride - level - 1)
+        for bit in (0, 1):
+            child = node.children[bit]
+            start = slot + bit * span
+            if child is None:
+                slot_entries[start : start + span] = [best] * span
+            else:
+                stack.append((child, level + 1, start, best))
+
+    pop_node = PopNode()
+    previous: Any = object()
+    for slot, entry in enumerate(slot_entries):
+        if entry is not previous:
+            pop_node.leafvec |= 1 << slot
+            pop_node.leaves.append(entry)
+            previous = entry
+        child = child_nodes[slot]
+        if child is not None:
+            pop_node.bitmap |= 1 << slot
+            pop_node.children.append(child)
+    return pop_node
+
+
+def _poptrie_lookup(root: PopNode, ip: int) -> Optional[Tuple[str, Any]]:
+    """Return the longest matching (prefix, value) entry for an IPv4 address."""
+    node = root
+    for shift, mask in _POPTRIE_STRIDES:
+        bit = 1 << ((ip >> shift) & mask)
+        if not node.bitmap & bit:
+            return node.leaves[(node.leafvec & ((bit << 1) - 1)).bit_count() - 1]
+        node = node.children[(node.bitmap & (bit - 1)).bit_count()]
+    return None
+
+
 class RadixTree:
     """
     Radix tree (Patricia trie) for efficient prefix lookup.
     
-    Useful for longest prefix matching in BGP routing tables.
+    Useful for longest prefix matching in BGP routing tables. IPv4 prefixes
+    are also kept in a binary trie, which longest_prefix_match() walks bit
+    by bit for IPv4 address keys.
+
+    compile() is an explicit step for read-mostly tables: it snapshots the
+    binary trie into NumPy arrays searched by a JIT-compiled integer walk,
+    into C-typed nodes when the _radix extension is built, or, without
+    either numba or the extension, into a poptrie that resolves an address
+    in at most six 64-way steps using int.bit_count(). Inserts and deletes
+    stay incremental and mark the snapshot stale; lookups then use the
+    binary trie until compile() is called again, so interleaved updates
+    never pay for a rebuild.
     """
 
-    def __init__(self):
+    def __init__(self, use_poptrie: Optional[bool] = None):
+        """
+        Initialize an empty tree.
+        
+        Args:
+            use_poptrie: Use the poptrie for IPv4 lookups instead of the C
+                extension or the NumPy arrays. Defaults to True when neither
+                the extension nor numba is available.
+        """
         self.root = RadixNode()
+        if use_poptrie is None:
+            use_poptrie = _radix is None and not _HAVE_NUMBA
+        self.use_poptrie = use_poptrie
+        self.ipv4_root = BitNode()
+        self._count = 0
+        self._compiled = False
+        self._entries: list[Tuple[str, Any]] = []
+        self._poptrie: Optional[PopNode] = None
+        self._ctrie: Any = None
 
     def insert(self, prefix: str, value: Any) -> None:
         """
@@ -32,21 +248,84 @@ class RadixTree:
             prefix: Prefix string (e.g., "192.0.2.0/24")
             value: Value to store for this prefix
         """
-        self._insert_recursive(self.root, prefix, value, 0)
+        if self._insert_recursive(self.root, prefix, value, 0):
+            self._count += 1
+
+        parsed = _ipv4_prefix_to_int(prefix)
+        if parsed is not None:
+            self._insert_int(parsed[0], parsed[1], prefix, value)
+        self._compiled = False
+
+    def insert_int(self, address: int, prefixlen: int, value: Any) -> None:
+        """
+        Insert an IPv4 prefix given in integer form.
+        
+        Avoids parsing when the caller already holds the integer address,
+        such as BGPPeering.peer_ip_int. Host bits are masked off and the
+        prefix is stored under its canonical string form.
+        
+        Args:
+            address: IPv4 address as an unsigned 32-bit integer
+            prefixlen: Prefix length (0-32)
+            value: Value to store for this prefix
+        """
+        net = address & ((0xFFFFFFFF << (32 - prefixlen)) & 0xFFFFFFFF)
+        prefix = f"{_int_to_ipv4(net)}/{prefixlen}"
+        if self._insert_recursive(self.root, prefix, value, 0):
+            self._count += 1
+        self._insert_int(net, prefixlen, prefix, value)
+        self._compiled = False
+
+    def bulk_insert(self, entries: Iterable[Tuple[str, Any]]) -> None:
+        """
+        Insert many prefixes at once.
+        
+        Each prefix is parsed once and entries are inserted in ascending
+        prefix length order, so covering nodes exist before their more
+        specific children and the compiled view is invalidated only once.
+        Later entries win for duplicate prefixes, as with insert().
+        
+        Args:
+            entries: Iterable of (prefix, value) pairs
+        """
+        parsed = [(prefix, value, _ipv4_prefix_to_int(prefix)) for prefix, value in entries]
+        parsed.sort(key=lambda entry: entry[2][1] if entry[2] is not None else 33)
+
+        added = 0
+        for prefix, value, network in parsed:
+            added += self._insert_recursive(self.root, prefix, value, 0)
+            if network is not None:
+                self._insert_int(network[0], network[1], prefix, value)
+
+        self._count += added
+        self._compiled = False
+
+    def _insert_int(self, net: int, prefixlen: int, prefix: str, value: Any) -> None:
+        """Insert an integer-keyed IPv4 prefix into the binary trie."""
+        node = self.ipv4_root
+        for depth in range(prefixlen):
+            bit = (net >> (31 - depth)) & 1
+            child = node.children[bit]
+            if child is None:
+                child = node.children[bit] = BitNode()
+            node = child
+        node.entry = (prefix, value)
 
     def _insert_recursive(
         self, node: RadixNode, prefix: str, value: Any, index: int
-    ) -> None:
-        """Recursive helper for insert."""
+    ) -> bool:
+        """Recursive helper for insert. Returns True if a new prefix was added."""
         if index >= len(prefix):
+            added = not node.is_leaf
             node.value = value
             node.is_leaf = True
-            return
+            return added
 
         char = prefix[index]
         if char not in node.children:
             node.children[char] = RadixNode(prefix[index:], value)
             node.children[char].is_leaf = True
+            return True
         else:
             child = node.children[char]
             # Find common prefix
@@ -60,7 +339,7 @@ class RadixTree:
 
             if common_len == len(child.prefix):
                 # Continue with child
-                self._insert_recursive(child, prefix, value, index + common_len)
+                return self._insert_recursive(child, prefix, value, index + common_len)
             else:
                 # Split node
                 split_node = RadixNode(child.prefix[common_len:], child.value)
@@ -79,6 +358,7 @@ class RadixTree:
                 else:
                     child.value = value
                     child.is_leaf = True
+                return True
 
     def search(self, prefix: str) -> Optional[Any]:
         """
@@ -93,30 +373,171 @@ class RadixTree:
         node = self._search_node(prefix)
         return node.value if node and node.is_leaf else None
 
+    def compile(self) -> None:
+        """
+        Flatten stored IPv4 prefixes into a structure-of-arrays binary trie.
+
+        Node i of the trie is described by keys[i], masks[i], values[i],
+        left[i] and right[i]; values holds an index into the entry list.
+        The arrays are a pre-order flattening of the binary IPv4 trie kept
+        up to date by insert() and delete(). They are a snapshot: any later
+        modification makes longest_prefix_match() fall back to the binary
+        trie until compile() is called again.
+
+        A 65536-slot first-level table indexed by the top 16 address bits is
+        built alongside the trie. Prefixes up to /16 are leaf-pushed into it,
+        so most lookups are a single array probe; slots covered by a longer
+        prefix hold the /16 trie node (tagged with _L1_NODE) to descend from.
+
+        When use_poptrie is set, a poptrie is built from the binary trie
+        instead of the arrays; otherwise, if the _radix extension is
+        available, the trie is converted to C-typed nodes.
+        """
+        root = self.ipv4_root
+        empty = root.entry is None and root.children == [None, None]
+        if self.use_poptrie:
+            self._poptrie = None if empty else _build_poptrie(root, 0, None)
+            self._compiled = True
+            return
+        if _radix is not None:
+            self._ctrie = None if empty else _radix.build(root)
+            self._compiled = True
+            return
+
+        import numpy as np
+
+        entries: list[Tuple[str, Any]] = []
+        keys: list[int] = []
+        masks: list[int] = []
+        values: list[int] = []
+        left: list[int] = []
+        right: list[int] = []
+        placed: list[Tuple[int, int, int]] = []
+
+        # (node, network, depth, parent index, branch bit, /16 ancestor index)
+        stack = [(self.ipv4_root, 0, 0, -1, 0, -1)]
+        while stack:
+            bit_node, net, depth, parent, bit, node16 = stack.pop()
+            index = len(keys)
+            if parent >= 0:
+                (right if bit else left)[parent] = index
+            if depth == 16:
+                node16 = index
+
+            keys.append(net)
+            masks.append((0xFFFFFFFF << (32 - depth)) & 0xFFFFFFFF)
+            values.append(-1)
+            left.append(-1)
+            right.append(-1)
+
+            if bit_node.entry is not None:
+                values[index] = len(entries)
+                entries.append(bit_node.entry)
+                placed.append((depth, net, node16 if depth > 16 else -1))
+
+            for child_bit in (1, 0):
+                child = bit_node.children[child_bit]
+                if child is not None:
+                    child_net = net | (child_bit << (31 - depth))
+                    stack.append((child, child_net, depth + 1, index, child_bit, node16))
+
+        l1 = np.full(65536, -1, dtype=np.int32)
+        placed_by_len = sorted(range(len(placed)), key=lambda i: placed[i][0])
+        for index in placed_by_len:
+            prefixlen, net, _ = placed[index]
+            if prefixlen > 16:
+                break
+            start = net >> 16
+            l1[start : start + (1 << (16 - prefixlen))] = index
+
+        for prefixlen, net, node16 in placed:
+            if prefixlen <= 16:
+                continue
+            slot = net >> 16
+            cover = int(l1[slot])
+            if cover < -1:
+                continue
+            if values[node16] < 0:
+                values[node16] = cover
+            l1[slot] = node16 | _L1_NODE
+
+        self._entries = entries
+        self._l1 = l1
+        self._keys = np.array(keys, dtype=np.uint32)
+        self._masks = np.array(masks, dtype=np.uint32)
+        self._values = np.array(values, dtype=np.int32)
+        self._left = np.array(left, dtype=np.int32)
+        self._right = np.array(right, dtype=np.int32)
+        self._lpm = _load_lpm()
+        self._compiled = True
+
     def longest_prefix_match(self, key: str) -> Optional[Tuple[str, Any]]:
         """
         Find longest prefix match for a given key.
         
+        IPv4 address keys are matched bit-wise against the stored IPv4
+        prefixes, through the compile() snapshot when it is current and the
+        binary trie otherwise; any other key falls back to a character walk.
+        
         Args:
             key: Key to search for
             
         Returns:
             Tuple of (prefix, value) if found, None otherwise
         """
-        result = None
+        ip = _ipv4_to_int(key)
+        if ip is not None:
+            if not self._compiled:
+                return self._bit_trie_lookup(ip)
+            if self.use_poptrie:
+                if self._poptrie is not None:
+                    return _poptrie_lookup(self._poptrie, ip)
+            elif _radix is not None:
+                if self._ctrie is not None:
+                    return _radix.longest_prefix_match(self._ctrie, ip)
+            elif self._entries:
+                index = int(self._l1[ip >> 16])
+                if index < -1:
+                    index = self._lpm(
+                        self._keys,
+                        self._masks,
+                        self._values,
+                        self._left,
+                        self._right,
+                        ip,
+                        index & _L1_NODE_MASK,
+                        16,
+                    )
+                return self._entries[index] if index >= 0 else None
+
+        best: Optional[Tuple[int, Any]] = None
         node = self.root
-        matched_prefix = ""
+        index = 0
 
-        for char in key:
-            if char not in node.children:
+        while index < len(key):
+            child = node.children.get(key[index])
+            if child is None or not key.startswith(child.prefix, index):
                 break
-            node = node.children[char]
-            matched_prefix += node.prefix
+            node = child
+            index += len(node.prefix)
 
             if node.is_leaf:
-                result = (matched_prefix, node.value)
-
-        return result
+                best = (index, node.value)
+
+        # Slice the matched prefix once instead of concatenating per level
+        return (key[: best[0]], best[1]) if best else None
+
+    def _bit_trie_lookup(self, ip: int) -> Optional[Tuple[str, Any]]:
+        """Walk the binary IPv4 trie and return the longest matching (prefix, value) entry."""
+        node = self.ipv4_root
+        best = node.entry
+        for depth in range(32):
+            node = node.children[(ip >> (31 - depth)) & 1]
+            if node is None:
+                break
+            if node.entry is not None:
+                best = node.entry
+        return best
 
     def _search_node(self, prefix: str) -> Optional[RadixNode]:
         """Search for a node matching the prefix."""
@@ -152,7 +573,40 @@ class RadixTree:
         Returns:
             True if deleted, False if not found
         """
-        return self._delete_recursive(self.root, prefix, 0)
+        deleted = self._delete_recursive(self.root, prefix, 0)
+        if deleted:
+            self._count -= 1
+            self._delete_ipv4(prefix)
+            self._compiled = False
+        return deleted
+
+    def _delete_ipv4(self, prefix: str) -> None:
+        """Remove a prefix from the binary IPv4 trie and prune empty nodes."""
+        parsed = _ipv4_prefix_to_int(prefix)
+        if parsed is None:
+            return
+
+        net, prefixlen = parsed
+        path = []
+        node = self.ipv4_root
+        for depth in range(prefixlen):
+            bit = (net >> (31 - depth)) & 1
+            child = node.children[bit]
+            if child is None:
+                return
+            path.append((node, bit))
+            node = child
+
+        # Another spelling of the same network may have replaced this entry
+        if node.entry is None or node.entry[0] != prefix:
+            return
+        node.entry = None
+
+        for parent, bit in reversed(path):
+            child = parent.children[bit]
+            if child.entry is not None or child.children != [None, None]:
+                break
+            parent.children[bit] = None
 
     def _delete_recursive(self, node: RadixNode, prefix: str, index: int) -> bool:
         """Recursive helper for delete."""
@@ -168,6 +622,9 @@ class RadixTree:
             return False
 
         child = node.children[char]
+        # The whole edge label must match, not just its first character
+        if not prefix.startswith(child.prefix, index):
+            return False
         if self._delete_recursive(child, prefix, index + len(child.prefix)):
             # Clean up empty nodes
             if not child.is_leaf and not child.children:
@@ -178,20 +635,17 @@ class RadixTree:
 
     def __iter__(self) -> Iterator[Tuple[str, Any]]:
         """Iterate over all prefixes and values."""
-        yield from self._iter_recursive(self.root, "")
-
-    def _iter_recursive(
-        self, node: RadixNode, prefix: str
-    ) -> Iterator[Tuple[str, Any]]:
-        """Recursive helper for iteration."""
-        current_prefix = prefix + node.prefix
-        if node.is_leaf:
-            yield (current_prefix, node.value)
+        stack = [(self.root, "")]
+        while stack:
+            node, prefix = stack.pop()
+            current_prefix = prefix + node.prefix
+            if node.is_leaf:
+                yield (current_prefix, node.value)
 
-        for child in node.children.values():
-            yield from self._iter_recursive(child, current_prefix)
+            # Push in reverse so children are visited in insertion order
+            stack.extend((child, current_prefix) for child in reversed(node.children.values()))
 
     def __len__(self) -> int:
         """Get number of prefixes in the tree."""
-        return sum(1 for _ in self)
+        return self._count
 
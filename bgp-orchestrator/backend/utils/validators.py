@@ -2,8 +2,20 @@
 BGP data validation utilities.
 """
 import ipaddress
+import re
+from functools import lru_cache
 from typing import Any
 
+# Dotted-quad address and prefix, matched over ASCII bytes; octet range and
+# leading zeros are checked separately
+_IPV4_ADDRESS_RE = re.compile(rb"(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})")
+_IPV4_PREFIX_RE = re.compile(rb"(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})/(\d{1,2})")
+
+
+def _valid_octet(octet: bytes) -> bool:
+    """Check a decimal octet is 0-255 without leading zeros."""
+    return int(octet) <= 255 and (len(octet) == 1 or octet[:1] != b"0")
+
 
 def validate_asn(asn: Any) -> int:
     """
@@ -27,6 +39,9 @@ def validate_asn(asn: Any) -> int:
         raise ValueError(f"Invalid ASN: {asn}") from e
 
 
+# The address and prefix validators memoise str input in private lru_cache
+# helpers. Other input (an int, or a list from a JSON body) is parsed uncached,
+# since lru_cache would raise TypeError on an unhashable key before validating
 def validate_ipv4_address(address: str) -> str:
     """
     Validate IPv4 address.
@@ -40,6 +55,23 @@ def validate_ipv4_address(address: str) -> str:
     Raises:
         ValueError: If address is invalid
     """
+    if isinstance(address, str):
+        return _validate_ipv4_address(address)
+    try:
+        return str(ipaddress.IPv4Address(address))
+    except ValueError as e:
+        raise ValueError(f"Invalid IPv4 address: {address}") from e
+
+
+@lru_cache(maxsize=65536)
+def _validate_ipv4_address(address: str) -> str:
+    """Cached validate_ipv4_address for string input."""
+    # Fast path: a well-formed dotted quad is already in canonical form
+    if address.isascii():
+        match = _IPV4_ADDRESS_RE.fullmatch(address.encode("ascii"))
+        if match and all(_valid_octet(octet) for octet in match.groups()):
+            return address
+
     try:
         ip = ipaddress.IPv4Address(address)
         return str(ip)
@@ -47,6 +79,42 @@ def validate_ipv4_address(address: str) -> str:
         raise ValueError(f"Invalid IPv4 address: {address}") from e
 
 
+def validate_ipv4_address_int(address: str) -> int:
+    """
+    Validate IPv4 address and return it as an unsigned 32-bit integer.
+    
+    Args:
+        address: IPv4 address string
+        
+    Returns:
+        Integer form of the address
+        
+    Raises:
+        ValueError: If address is invalid
+    """
+    if isinstance(address, str):
+        return _validate_ipv4_address_int(address)
+    try:
+        return int(ipaddress.IPv4Address(address))
+    except ValueError as e:
+        raise ValueError(f"Invalid IPv4 address: {address}") from e
+
+
+@lru_cache(maxsize=65536)
+def _validate_ipv4_address_int(address: str) -> int:
+    """Cached validate_ipv4_address_int for string input."""
+    if address.isascii():
+        match = _IPV4_ADDRESS_RE.fullmatch(address.encode("ascii"))
+        if match and all(_valid_octet(octet) for octet in match.groups()):
+            a, b, c, d = (int(octet) for octet in match.groups())
+            return (a << 24) | (b << 16) | (c << 8) | d
+
+    try:
+        return int(ipaddress.IPv4Address(address))
+    except (ValueError, ipaddress.AddressValueError) as e:
+        raise ValueError(f"Invalid IPv4 address: {address}") from e
+
+
 def validate_ipv6_address(address: str) -> str:
     """
     Validate IPv6 address.
@@ -60,6 +128,17 @@ def validate_ipv6_address(address: str) -> str:
     Raises:
         ValueError: If address is invalid
     """
+    if isinstance(address, str):
+        return _validate_ipv6_address(address)
+    try:
+        return str(ipaddress.IPv6Address(address))
+    except ValueError as e:
+        raise ValueError(f"Invalid IPv6 address: {address}") from e
+
+
+@lru_cache(maxsize=65536)
+def _validate_ipv6_address(address: str) -> str:
+    """Cached validate_ipv6_address for string input."""
     try:
         ip = ipaddress.IPv6Address(address)
         return str(ip)
@@ -80,6 +159,34 @@ def validate_ipv4_prefix(prefix: str) -> str:
     Raises:
         ValueError: If prefix is invalid
     """
+    if isinstance(prefix, str):
+        return _validate_ipv4_prefix(prefix)
+    try:
+        return str(ipaddress.IPv4Network(prefix, strict=False))
+    except ValueError as e:
+        raise ValueError(f"Invalid IPv4 prefix: {prefix}") from e
+
+
+@lru_cache(maxsize=65536)
+def _validate_ipv4_prefix(prefix: str) -> str:
+    """Cached validate_ipv4_prefix for string input."""
+    # Fast path: plain dotted-quad/length, normalised without ipaddress
+    match = None
+    if prefix.isascii():
+        match = _IPV4_PREFIX_RE.fullmatch(prefix.encode("ascii"))
+    if match:
+        *octets, length = match.groups()
+        prefixlen = int(length)
+        if prefixlen <= 32 and all(_valid_octet(octet) for octet in octets):
+            address = 0
+            for octet in octets:
+                address = (address << 8) | int(octet)
+            address &= (0xFFFFFFFF << (32 - prefixlen)) & 0xFFFFFFFF
+            return (
+                f"{address >> 24}.{(address >> 16) & 0xFF}."
+                f"{(address >> 8) & 0xFF}.{address & 0xFF}/{prefixlen}"
+            )
+
     try:
         network = ipaddress.IPv4Network(prefix, strict=False)
         return str(network)
@@ -100,9 +207,19 @@ def validate_ipv6_prefix(prefix: str) -> str:
     Raises:
         ValueError: If prefix is invalid
     """
+    if isinstance(prefix, str):
+        return _validate_ipv6_prefix(prefix)
+    try:
+        return str(ipaddress.IPv6Network(prefix, strict=False))
+    except ValueError as e:
+        raise ValueError(f"Invalid IPv6 prefix: {prefix}") from e
+
+
+@lru_cache(maxsize=65536)
+def _validate_ipv6_prefix(prefix: str) -> str:
+    """Cached validate_ipv6_prefix for string input."""
     try:
         network = ipaddress.IPv6Network(prefix, strict=False)
         return str(network)
     except (ValueError, ipaddress.NetmaskValueError) as e:
         raise ValueError(f"Invalid IPv6 prefix: {prefix}") from e
-
@@ -2,34 +2,47 @@
 Pytest configuration and fixtures for BGP Orchestrator tests.
 """
 import asyncio
+import sys
 from typing import AsyncGenerator
 
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.pool import StaticPool
 
-import sys
-from pathlib import Path
-
-# Add backend to path
-backend_path = Path(__file__).parent.parent / "backend"
-sys.path.insert(0, str(backend_path))
-
+# Backend packages are installed with `pip install -e backend`
 from app.config import settings
 from app.dependencies import get_db, get_redis
 from app.main import app
 from models.peering import Base as ModelBase
 from security.auth import User, jwt_manager
 
+# uvloop is installed by uvicorn[standard] but is not available on Windows
+if sys.platform != "win32":
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+else:
+    uvloop = None
+
 
 # Pytest-asyncio configuration
 @pytest.fixture(scope="session")
-def event_loop():
+def event_loop_policy():
+    """Use uvloop's event loop policy for async tests when available."""
+    if uvloop is not None:
+        return uvloop.EventLoopPolicy()
+    return asyncio.DefaultEventLoopPolicy()
+
+
+@pytest.fixture(scope="session")
+def event_loop(event_loop_policy):
     """Create event loop for async tests."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
+    loop = event_loop_policy.new_event_loop()
     yield loop
     loop.close()
 
@@ -45,6 +58,16 @@ async def test_db_engine():
         echo=False,
     )
 
+    # Let SQLAlchemy emit BEGIN itself; pysqlite's implicit transactions
+    # break the SAVEPOINTs used for per-test rollback in async_db_session
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     # Create all tables
     async with engine.begin() as conn:
         await conn.run_sync(ModelBase.metadata.create_all)
@@ -60,24 +83,33 @@ async def async_db_session(test_db_engine) -> AsyncGenerator[AsyncSession, None]
     """
     Create async database session for tests.
 
+    The session joins an outer transaction that is rolled back after the
+    test, so every test sees the empty schema without per-table cleanup.
+    Commits made by the code under test only release a savepoint.
+
     Usage:
         async def test_something(async_db_session):
             result = await async_db_session.execute(select(...))
     """
-    async_session_factory = async_sessionmaker(
-        test_db_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
+    async with test_db_engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
 
-    async with async_session_factory() as session:
         # Override get_db dependency
         async def override_get_db():
             yield session
 
         app.dependency_overrides[get_db] = override_get_db
-        yield session
-        app.dependency_overrides.clear()
+        try:
+            yield session
+        finally:
+            app.dependency_overrides.clear()
+            await session.close()
+            await trans.rollback()
 
 
 @pytest.fixture
@@ -232,19 +264,3 @@ def sample_bgp_peering_data():
     }
 
 
-@pytest.fixture(autouse=True)
-async def cleanup_database(async_db_session):
-    """Clean up database after each test."""
-    yield
-    # Clean up all tables
-    async with async_db_session.begin():
-        for table in reversed(ModelBase.metadata.sorted_tables):
-            await async_db_session.execute(table.delete())
-
-
-@pytest.fixture
-def event_loop_policy():
-    """Set event loop policy for asyncio tests."""
-    policy = asyncio.get_event_loop_policy()
-    return policy
-
@@ -12,14 +12,25 @@ Simulates:
 Usage:
     locust -f bgp_load_test.py --host=http://localhost:8000 --users 100 --spawn-rate 10
     locust -f bgp_load_test.py --host=http://localhost:8000 --headless --users 100 --spawn-rate 10 --run-time 5m
+
+Note:
+    FastHttpUser runs on gevent, so the asyncio event loop (and uvloop) does
+    not affect this client. If the users are ported to an asyncio-based HTTP
+    client, install uvloop's policy before the loop starts
+    (asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())) to cut
+    per-request loop overhead.
 """
 import random
 import time
 from typing import Optional
 
+import orjson
 from locust import HttpUser, task, between, events
 from locust.contrib.fasthttp import FastHttpUser
 
+# Number of precomputed peering payloads per user
+PEERING_POOL_SIZE = 10_000
+
 
 class BGPPeeringUser(FastHttpUser):
     """Locust user class for BGP Peering API load testing."""
@@ -29,50 +40,75 @@ class BGPPeeringUser(FastHttpUser):
     def on_start(self):
         """Called when a user starts. Used for setup."""
         self.auth_token = self.environment.parsed_options.auth_token if hasattr(self.environment.parsed_options, 'auth_token') else None
+        # Headers are fixed for the lifetime of the user, so build them once
+        self._headers = {"Authorization": f"Bearer {self.auth_token}"} if self.auth_token else {}
+        self._json_headers = {**self._headers, "Content-Type": "application/json"}
         self.peering_ids = []
         self.user_id = random.randint(1, 10000)
+        # user_id can repeat across users, so the pool RNG is seeded from OS entropy
+        self._peering_pool = self._build_peering_pool(random.Random())
+        # Create attempts so far; every attempt takes the next pool entry
+        self._create_attempts = 0
         
         # Health check
         response = self.client.get("/healthz", name="health_check")
         if response.status_code != 200:
             print(f"Warning: Health check failed with status {response.status_code}")
     
-    def generate_peering_data(self, peering_index: int) -> dict:
-        """Generate random BGP peering data."""
+    def _build_peering_pool(self, rng: random.Random) -> list:
+        """
+        Precompute randomized peering fields for this user.
+        
+        Uses a per-user Random instance so the request loop does no random
+        number generation or IP formatting of its own.
+        """
         local_asn = 65000 + (self.user_id % 100)
-        peer_asn = 65000 + random.randint(1, 1000)
-        peer_ip = f"{random.randint(10, 172)}.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}"
+        device = f"router-{self.user_id % 10}"
+        routing_policy = {
+            "import_policy": f"import-policy-{self.user_id}",
+            "export_policy": f"export-policy-{self.user_id}",
+        }
+        
+        pool = []
+        for _ in range(PEERING_POOL_SIZE):
+            peer_ip = f"{rng.randint(10, 172)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+            fields = {
+                "local_asn": local_asn,
+                "peer_asn": 65000 + rng.randint(1, 1000),
+                "peer_ip": peer_ip,
+                "hold_time": rng.randint(90, 360),
+                "keepalive": rng.randint(30, 120),
+                "device": device,
+                "status": "active",
+                "address_families": ["ipv4_unicast"],
+                "routing_policy": routing_policy,
+            }
+            pool.append((rng.randint(1000, 9999), fields))
+        return pool
+    
+    def generate_peering_data(self, peering_index: int) -> dict:
+        """Generate BGP peering data from the precomputed pool."""
+        name_suffix, fields = self._peering_pool[peering_index % PEERING_POOL_SIZE]
         
         return {
-            "name": f"load-test-peering-{self.user_id}-{peering_index}-{random.randint(1000, 9999)}",
-            "local_asn": local_asn,
-            "peer_asn": peer_asn,
-            "peer_ip": peer_ip,
-            "hold_time": random.randint(90, 360),
-            "keepalive": random.randint(30, 120),
-            "device": f"router-{self.user_id % 10}",
+            **fields,
+            "name": f"load-test-peering-{self.user_id}-{peering_index}-{name_suffix}",
             "interface": f"ethernet-0/0/{peering_index}",
-            "status": "active",
-            "address_families": ["ipv4_unicast"],
-            "routing_policy": {
-                "import_policy": f"import-policy-{self.user_id}",
-                "export_policy": f"export-policy-{self.user_id}",
-            },
         }
     
     @task(5)
     def create_peering(self):
         """Create a BGP peering (weight: 5)."""
-        peering_data = self.generate_peering_data(len(self.peering_ids))
-        
-        headers = {}
-        if self.auth_token:
-            headers["Authorization"] = f"Bearer {self.auth_token}"
+        # Advance on failures too, so a rejected payload is not sent again
+        peering_data = self.generate_peering_data(self._create_attempts)
+        self._create_attempts += 1
+        # Serialize with orjson rather than the client's stdlib json encoder
+        body = orjson.dumps(peering_data)
         
         with self.client.post(
             "/api/v1/bgp-peerings",
-            json=peering_data,
-            headers=headers,
+            data=body,
+            headers=self._json_headers,
             name="create_peering",
             catch_response=True,
         ) as response:
@@ -95,13 +131,9 @@ class BGPPeeringUser(FastHttpUser):
         page = random.randint(0, 10)
         limit = random.choice([10, 50, 100])
         
-        headers = {}
-        if self.auth_token:
-            headers["Authorization"] = f"Bearer {self.auth_token}"
-        
         with self.client.get(
             f"/api/v1/bgp-peerings?skip={page * limit}&limit={limit}",
-            headers=headers,
+            headers=self._headers,
             name="list_peerings",
             catch_response=True,
         ) as response:
@@ -125,13 +157,9 @@ class BGPPeeringUser(FastHttpUser):
         
         peering_id = random.choice(self.peering_ids)
         
-        headers = {}
-        if self.auth_token:
-            headers["Authorization"] = f"Bearer {self.auth_token}"
-        
         with self.client.get(
             f"/api/v1/bgp-peerings/{peering_id}",
-            headers=headers,
+            headers=self._headers,
             name="get_peering",
             catch_response=True,
         ) as response:
@@ -158,13 +186,9 @@ class BGPPeeringUser(FastHttpUser):
         device = f"router-{self.user_id % 10}"
         status = random.choice(["active", "pending", "disabled"])
         
-        headers = {}
-        if self.auth_token:
-            headers["Authorization"] = f"Bearer {self.auth_token}"
-        
         with self.client.get(
             f"/api/v1/bgp-peerings?device={device}&status={status}",
-            headers=headers,
+            headers=self._headers,
             name="filter_peerings",
             catch_response=True,
         ) as response:
@@ -8,6 +8,7 @@ configurations for load testing purposes.
 Usage:
     python generate_peers.py > exabgp-80k.conf
 """
+import io
 import sys
 
 # Configuration
@@ -17,12 +18,10 @@ BASE_ASN = 65000
 BASE_IP_NETWORK = "10.0"
 START_IP = 1
 
-def generate_peer_config(peer_index: int, local_ip: str, peer_asn: int) -> str:
-    """Generate ExaBGP peer configuration."""
-    router_id = local_ip
-    return f"""    neighbor {local_ip} {{
+# Bound str.format of the per-peer block, built once at import time
+PEER_TMPL = """    neighbor {local_ip} {{
         local-address 10.0.0.1;
-        local-as {BASE_ASN};
+        local-as {local_asn};
         peer-as {peer_asn};
         router-id {router_id};
         hold-time 180;
@@ -31,11 +30,16 @@ def generate_peer_config(peer_index: int, local_ip: str, peer_asn: int) -> str:
             ipv4 unicast;
         }}
     }}
-"""
+""".format
+
+def generate_peer_config(peer_index: int, local_ip: str, peer_asn: int) -> str:
+    """Generate ExaBGP peer configuration."""
+    return PEER_TMPL(local_ip=local_ip, local_asn=BASE_ASN, peer_asn=peer_asn, router_id=local_ip)
 
 def generate_exabgp_config(total_peers: int = TOTAL_PEERS) -> str:
     """Generate complete ExaBGP configuration."""
-    config = """# ExaBGP Configuration - Auto-generated for 80K BGP Peers
+    out = io.StringIO()
+    out.write("""# ExaBGP Configuration - Auto-generated for 80K BGP Peers
 # Generated for load testing
 
 process {
@@ -61,14 +65,14 @@ log {
 }
 
 # Peer groups
-"""
+""")
     
     # Generate peer groups
     group_num = 1
     peer_index = 0
     
     while peer_index < total_peers:
-        config += f"\ngroup peers-group-{group_num} {{\n"
+        out.write(f"\ngroup peers-group-{group_num} {{\n")
         
         for i in range(min(PEERS_PER_GROUP, total_peers - peer_index)):
             # Calculate IP address
@@ -79,13 +83,13 @@ log {
             # Calculate peer ASN
             peer_asn = BASE_ASN + (peer_index % 1000) + 1
             
-            config += generate_peer_config(peer_index, local_ip, peer_asn)
+            out.write(generate_peer_config(peer_index, local_ip, peer_asn))
             peer_index += 1
         
-        config += "}\n"
+        out.write("}\n")
         group_num += 1
     
-    return config
+    return out.getvalue()
 
 if __name__ == "__main__":
     total = int(sys.argv[1]) if len(sys.argv) > 1 else TOTAL_PEERS
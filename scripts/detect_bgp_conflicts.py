@@ -6,12 +6,13 @@ Detects concurrent changes to BGP sessions and route-maps
 
 import os
 import sys
-import json
+import hashlib
 import yaml
 import argparse
+import functools
 import ssl
-from datetime import datetime, timedelta
-from typing import Dict, List, Set, Tuple, Any
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any
 import httpx
 try:
     from infrahub_sdk import InfrahubClientSync
@@ -19,9 +20,95 @@ except ImportError:
     print("ERROR: infrahub_sdk not installed. Install with: pip install infrahub-sdk")
     sys.exit(1)
 from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
+from gql.transport.httpx import HTTPXTransport
+try:
+    from scripts.json_output import dumps
+except ImportError:  # run directly as scripts/detect_bgp_conflicts.py
+    from json_output import dumps
+
+# NetworkBGPSessionLog entries within the window at which a session counts as flapping
+FLAP_THRESHOLD = 3
+
+# NetworkBGPSession fields consumed by detect_conflicts
+LEAN_SESSION_FIELDS = """
+                            name
+                            peer_ip
+                            route_map_in
+                            route_map_out
+                            changed_at
+                            created_by {
+                                display_label
+                            }
+                            instance {
+                                node {
+                                    device {
+                                        node {
+                                            name
+                                        }
+                                    }
+                                }
+                            }
+"""
+
+# Full NetworkBGPSession field set, flattened by BGPConflictDetector._flatten_session
+SESSION_FIELDS = """
+                            id
+                            name
+                            peer_ip
+                            peer_asn
+                            route_map_in
+                            route_map_out
+                            hold_time
+                            state
+                            changed_at
+                            created_by {
+                                id
+                                display_label
+                            }
+                            instance {
+                                node {
+                                    device {
+                                        node {
+                                            name
+                                            id
+                                        }
+                                    }
+                                }
+                            }
+"""
+
+def _recent_changes_query(fields: str):
+    """Build the recent NetworkBGPSession changes query for a field selection"""
+    return gql("""
+        query GetRecentBGPChanges($since: DateTime!) {
+            NetworkBGPSession(changed_at__gte: $since) {
+                edges {
+                    node {""" + fields + """
+                    }
+                }
+            }
+        }
+    """)
+
+# Lean NetworkBGPSession selection for a batch of names, used by load_many
+_SESSIONS_BY_NAME_QUERY = gql("""
+        query GetBGPSessionsByName($names: [String]) {
+            NetworkBGPSession(name__values: $names) {
+                edges {
+                    node {""" + LEAN_SESSION_FIELDS + """
+                    }
+                }
+            }
+        }
+    """)
 
 class BGPConflictDetector:
+    # libyaml-backed loader when PyYAML was built with it
+    yaml_loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    
+    # GraphQL documents are parsed once, when the class is created
+    _RECENT_QUERY = _recent_changes_query(LEAN_SESSION_FIELDS)
+    _RECENT_QUERY_FULL = _recent_changes_query(SESSION_FIELDS)
     def __init__(self, infrahub_url: str, infrahub_token: str):
         self.infrahub_url = infrahub_url
         self.infrahub_token = infrahub_token
@@ -29,18 +116,45 @@ class BGPConflictDetector:
         # GraphQL client for complex queries
         # Note: verify=True should be used in production with proper certificates
         verify_ssl = os.getenv("INFRAHUB_VERIFY_SSL", "false").lower() == "true"
-        transport = RequestsHTTPTransport(
+        transport = HTTPXTransport(
             url=f"{infrahub_url}/graphql",
             headers={'Authorization': f'Bearer {infrahub_token}'},
-            verify=verify_ssl
+            verify=verify_ssl,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=30.0)
         )
         self.graphql_client = Client(transport=transport, fetch_schema_from_transport=False)
+        # Client.execute() connects and closes the transport on every call;
+        # a single session keeps the keep-alive connection for the whole run
+        self.graphql_session = self.graphql_client.connect_sync()
         
         # REST client for simple queries
         self.rest_client = InfrahubClientSync(
             address=infrahub_url,
             token=infrahub_token
         )
+        
+        # Pooled HTTP client for GitLab API calls
+        self._http = httpx.Client(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4)
+        )
+        
+        # Flattened sessions seen during this run, keyed by session name
+        self._session_cache: Dict[str, Dict[str, Any]] = {}
+    
+    def close(self):
+        """Close the GraphQL session and the GitLab HTTP client"""
+        try:
+            self.graphql_client.close_sync()
+        finally:
+            self._http.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
     
     def extract_bgp_changes_from_git(self, diff_files: str) -> Dict[str, Any]:
         """
@@ -49,31 +163,52 @@ class BGPConflictDetector:
             device_name: {
                 sessions: Set[session_names],
                 route_maps: Set[route_map_names],
-                file_path: str
+                file_path: str,
+                raw_config: parsed YAML, or None if the file has no bgp_peers
             }
         }
         """
         changed_objects = {}
+        # Parsed YAML keyed by content hash, so identical files are parsed once
+        parsed_by_hash = {}
         
         for file_path in diff_files.split():
-            if not file_path or not os.path.exists(file_path):
-                continue
-                
+            # Filter on the path before touching the filesystem
             if "bgp/" not in file_path:
                 continue
-                
-            print(f"Analyzing Git change: {file_path}")
             
-            # Extract device name
             parts = file_path.split('/')
             if len(parts) < 3:
                 continue
             
+            # Load BGP config; deleted files are skipped by the open itself
+            # rather than a separate exists() stat. libyaml decodes the bytes
+            try:
+                with open(file_path, 'rb') as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                continue
+            
+            print(f"Analyzing Git change: {file_path}")
+            
+            # Extract device name
             device_name = parts[-1].replace('.yaml', '').replace('.yml', '')
             
-            # Load BGP config
-            with open(file_path, 'r') as f:
-                config = yaml.safe_load(f)
+            # Route-map, policy and global files define no peers; skip parsing them
+            if b'bgp_peers' not in raw:
+                changed_objects[device_name] = {
+                    'sessions': frozenset(),
+                    'route_maps': frozenset(),
+                    'file_path': file_path,
+                    'raw_config': None
+                }
+                continue
+            
+            digest = hashlib.blake2b(raw, digest_size=8).digest()
+            config = parsed_by_hash.get(digest)
+            if config is None:
+                config = yaml.load(raw, Loader=self.yaml_loader)
+                parsed_by_hash[digest] = config
             
             sessions = set()
             route_maps = set()
@@ -82,86 +217,43 @@ class BGPConflictDetector:
             for peer in config.get('bgp_peers', []):
                 session_name = f"{device_name}_{peer['peer_ip']}"
                 sessions.add(session_name)
-                
-                if 'route_map_in' in peer:
-                    route_maps.add(peer['route_map_in'])
-                if 'route_map_out' in peer:
-                    route_maps.add(peer['route_map_out'])
+                route_maps.update(
+                    route_map
+                    for key in ('route_map_in', 'route_map_out')
+                    if (route_map := peer.get(key))
+                )
             
             changed_objects[device_name] = {
-                'sessions': sessions,
-                'route_maps': route_maps,
+                'sessions': frozenset(sessions),
+                'route_maps': frozenset(route_maps),
                 'file_path': file_path,
                 'raw_config': config
             }
         
         return changed_objects
     
-    def get_recent_bgp_changes_graphql(self, since_minutes: int) -> List[Dict[str, Any]]:
+    def get_recent_bgp_changes_graphql(self, since_minutes: int, full: bool = False,
+                                       now: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """
         Query Infrahub for recent BGP changes via GraphQL
         More efficient than REST for complex queries
+        Only the fields detect_conflicts uses are selected unless full=True
+        The window ends at now (the run start time in main), or the current time
         """
-        query = gql("""
-            query GetRecentBGPChanges($since: DateTime!) {
-                NetworkBGPSession(changed_at__gte: $since) {
-                    count
-                    edges {
-                        node {
-                            id
-                            name
-                            peer_ip
-                            peer_asn
-                            route_map_in
-                            route_map_out
-                            hold_time
-                            state
-                            changed_at
-                            created_by {
-                                id
-                                display_label
-                            }
-                            instance {
-                                node {
-                                    device {
-                                        node {
-                                            name
-                                            id
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-        """)
+        query = self._RECENT_QUERY_FULL if full else self._RECENT_QUERY
         
-        cutoff = datetime.now() - timedelta(minutes=since_minutes)
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(minutes=since_minutes)
         
         try:
-            result = self.graphql_client.execute(query, variable_values={
+            result = self.graphql_session.execute(query, variable_values={
                 "since": cutoff.isoformat()
             })
             
-            sessions = []
-            for edge in result['NetworkBGPSession']['edges']:
-                node = edge['node']
-                # Flatten nested structure for easier processing
-                device_name = node['instance']['node']['device']['node']['name']
-                sessions.append({
-                    'id': node['id'],
-                    'name': node['name'],
-                    'device': device_name,
-                    'peer_ip': node['peer_ip'],
-                    'peer_asn': node['peer_asn'],
-                    'route_map_in': node['route_map_in'],
-                    'route_map_out': node['route_map_out'],
-                    'hold_time': node['hold_time'],
-                    'state': node['state'],
-                    'changed_at': node['changed_at'],
-                    'changed_by': node['created_by']['display_label']
-                })
+            sessions = [
+                self._flatten_session(edge['node'])
+                for edge in result['NetworkBGPSession']['edges']
+            ]
+            self._session_cache.update((session['name'], session) for session in sessions)
             
             print(f"Found {len(sessions)} recent BGP changes in Infrahub")
             return sessions
@@ -170,107 +262,206 @@ class BGPConflictDetector:
             print(f"WARNING: GraphQL query failed: {e}")
             return []
     
-    def check_session_flapping(self, session_name: str, window_minutes: int = 5) -> Dict[str, Any]:
+    def load_many(self, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Return flattened sessions by name, fetching the ones not yet cached in one query
+        Names unknown to Infrahub are left out of the result
+        """
+        missing = [name for name in dict.fromkeys(names) if name not in self._session_cache]
+        if missing:
+            try:
+                result = self.graphql_session.execute(_SESSIONS_BY_NAME_QUERY, variable_values={
+                    "names": missing
+                })
+                self._session_cache.update(
+                    (edge['node']['name'], self._flatten_session(edge['node']))
+                    for edge in result['NetworkBGPSession']['edges']
+                )
+            except Exception as e:
+                print(f"WARNING: Failed to load BGP sessions {', '.join(missing)}: {e}")
+        
+        return {name: self._session_cache[name] for name in names if name in self._session_cache}
+    
+    @staticmethod
+    def _flatten_session(node: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten a NetworkBGPSession node (lean or full selection) for easier processing"""
+        session = {
+            'name': node['name'],
+            'device': node['instance']['node']['device']['node']['name'],
+            'peer_ip': node['peer_ip'],
+            'route_map_in': node['route_map_in'],
+            'route_map_out': node['route_map_out'],
+            'changed_at': node['changed_at'],
+            'changed_by': node['created_by']['display_label']
+        }
+        # Fields only present in the full selection
+        for key in ('id', 'peer_asn', 'hold_time', 'state'):
+            if key in node:
+                session[key] = node[key]
+        return session
+    
+    def check_session_flapping(self, session_name: str, window_minutes: int = 5,
+                               now: Optional[datetime] = None) -> Dict[str, Any]:
         """
         Check if a BGP session is flapping (high state change frequency)
         """
-        query = gql("""
-            query GetSessionHistory($name: String!, $since: DateTime!) {
-                NetworkBGPSession(name__value: $name) {
-                    edges {
-                        node {
-                            id
-                            state
-                            changed_at
-                        }
-                    }
-                }
-                NetworkBGPSessionLog(
-                    object_id__value: $name,
-                    changed_at__gte: $since
-                ) {
-                    count
-                }
-            }
-        """)
+        return self.check_sessions_flapping([session_name], window_minutes, now)[session_name]
+    
+    def check_sessions_flapping(self, session_names: List[str], window_minutes: int = 5,
+                                now: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Check several BGP sessions for flapping with a single GraphQL request
+        Sessions are read through the session cache; those not changed since the
+        window start cannot be flapping and are left out of the request
+        Each remaining session gets an aliased logN selection counting its recent state changes
+        Returns: {session_name: {is_flapping: bool, state_changes: int}}
+        """
+        names = list(dict.fromkeys(session_names))
+        if not names:
+            return {}
+        
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(minutes=window_minutes)
+        sessions = self.load_many(names)
+        
+        flapping = {name: {'is_flapping': False, 'state_changes': 0} for name in names}
+        active = [
+            name for name in names
+            if name in sessions and self._changed_since(sessions[name], cutoff)
+        ]
+        if not active:
+            return flapping
         
-        cutoff = datetime.now() - timedelta(minutes=window_minutes)
+        query = self._history_query(len(active))
+        variable_values = {f"name{i}": name for i, name in enumerate(active)}
+        variable_values["since"] = cutoff.isoformat()
         
         try:
-            result = self.graphql_client.execute(query, variable_values={
-                "name": session_name,
-                "since": cutoff.isoformat()
-            })
-            
-            # Simulate flapping detection (simplified)
-            # In production, query logs/telemetry
-            return {
-                'is_flapping': False,  # Placeholder for real telemetry
-                'state_changes': 0
-            }
+            result = self.graphql_session.execute(query, variable_values=variable_values)
         except Exception as e:
-            print(f"WARNING: Failed to check session flapping for {session_name}: {e}")
-            return {'is_flapping': False, 'state_changes': 0}
+            print(f"WARNING: Failed to check session flapping for {', '.join(active)}: {e}")
+            result = {}
+        
+        for i, name in enumerate(active):
+            state_changes = (result.get(f"log{i}") or {}).get('count', 0)
+            flapping[name] = {
+                'is_flapping': state_changes >= FLAP_THRESHOLD,
+                'state_changes': state_changes
+            }
+        return flapping
+    
+    @staticmethod
+    def _changed_since(session: Dict[str, Any], cutoff: datetime) -> bool:
+        """Whether a flattened session changed at or after cutoff; unparsable timestamps count as changed"""
+        try:
+            changed_at = datetime.fromisoformat(session['changed_at'])
+        except (TypeError, ValueError):
+            return True
+        if changed_at.tzinfo is None:
+            changed_at = changed_at.replace(tzinfo=timezone.utc)
+        return changed_at >= cutoff
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _history_query(count: int):
+        """
+        Build the aliased session log query for a batch of count sessions
+        Documents are cached per batch size
+        """
+        variables = ", ".join(f"$name{i}: String!" for i in range(count))
+        selections = []
+        for i in range(count):
+            selections.append(f"""
+                log{i}: NetworkBGPSessionLog(
+                    object_id__value: $name{i},
+                    changed_at__gte: $since
+                ) {{
+                    count
+                }}""")
+        return gql(f"""
+            query GetSessionHistory($since: DateTime!, {variables}) {{{"".join(selections)}
+            }}
+        """)
     
-    def detect_conflicts(self, git_changes: Dict, recent_sessions: List[Dict]) -> List[Dict]:
+    def detect_conflicts(self, git_changes: Dict, recent_sessions: List[Dict],
+                         now: Optional[datetime] = None) -> List[Dict]:
         """
         Core conflict detection logic
+        Sessions changed in both Git and Infrahub are checked for flapping in one batched request
         """
         conflicts = []
         
+        # Index recent sessions by device, keeping only devices changed in Git
+        recent_by_device = {}
         for recent_session in recent_sessions:
             device = recent_session['device']
-            session_name = recent_session['name']
-            
-            # Skip if device not in Git changes
-            if device not in git_changes:
-                continue
-            
+            if device in git_changes:
+                recent_by_device.setdefault(device, []).append(recent_session)
+        
+        flapping = self.check_sessions_flapping([
+            recent_session['name']
+            for device, device_sessions in recent_by_device.items()
+            for recent_session in device_sessions
+            if recent_session['name'] in git_changes[device]['sessions']
+        ], now=now)
+        
+        for device, device_sessions in recent_by_device.items():
             git_data = git_changes[device]
+            changed_route_maps = git_data.get('route_maps', frozenset())
             
-            # 1. Direct session conflict
-            if session_name in git_data['sessions']:
-                conflicts.append({
-                    'severity': 'HIGH',
-                    'type': 'direct_session_conflict',
-                    'device': device,
-                    'session': session_name,
-                    'peer_ip': recent_session['peer_ip'],
-                    'changed_by': recent_session['changed_by'],
-                    'changed_at': recent_session['changed_at'],
-                    'description': f"BGP session {session_name} was recently modified by {recent_session['changed_by']} at {recent_session['changed_at']}"
-                })
-            
-            # 2. Route-map collision
-            changed_route_maps = git_data.get('route_maps', set())
-            session_route_maps = {
-                recent_session['route_map_in'],
-                recent_session['route_map_out']
-            } - {None}
-            
-            if changed_route_maps & session_route_maps:
-                conflicts.append({
-                    'severity': 'MEDIUM',
-                    'type': 'route_map_collision',
-                    'device': device,
-                    'session': session_name,
-                    'peer_ip': recent_session['peer_ip'],
-                    'route_map_in': recent_session['route_map_in'],
-                    'route_map_out': recent_session['route_map_out'],
-                    'changed_by': recent_session['changed_by'],
-                    'description': f"Route-map collision: {list(changed_route_maps & session_route_maps)[0]} affects {session_name}"
-                })
-            
-            # 3. BGP instance parameter conflict
-            # Check if hold_time or keepalive changed
-            # ... (expand as needed)
+            for recent_session in device_sessions:
+                session_name = recent_session['name']
+                
+                # 1. Direct session conflict, reported as flapping when the session is unstable
+                if session_name in git_data['sessions']:
+                    conflict = {
+                        'severity': 'HIGH',
+                        'type': 'direct_session_conflict',
+                        'device': device,
+                        'session': session_name,
+                        'peer_ip': recent_session['peer_ip'],
+                        'changed_by': recent_session['changed_by'],
+                        'changed_at': recent_session['changed_at'],
+                        'description': f"BGP session {session_name} was recently modified by {recent_session['changed_by']} at {recent_session['changed_at']}"
+                    }
+                    history = flapping[session_name]
+                    if history['is_flapping']:
+                        conflict['type'] = 'flapping_session_conflict'
+                        conflict['state_changes'] = history['state_changes']
+                        conflict['description'] = f"BGP session {session_name} is flapping ({history['state_changes']} state changes) and was recently modified by {recent_session['changed_by']} at {recent_session['changed_at']}"
+                    conflicts.append(conflict)
+                
+                # 2. Route-map collision (session-only diffs change no route-maps)
+                if changed_route_maps:
+                    session_route_maps = {
+                        route_map
+                        for route_map in (recent_session['route_map_in'], recent_session['route_map_out'])
+                        if route_map
+                    }
+                
+                    hits = changed_route_maps & session_route_maps
+                    if hits:
+                        conflicts.append({
+                            'severity': 'MEDIUM',
+                            'type': 'route_map_collision',
+                            'device': device,
+                            'session': session_name,
+                            'peer_ip': recent_session['peer_ip'],
+                            'route_map_in': recent_session['route_map_in'],
+                            'route_map_out': recent_session['route_map_out'],
+                            'changed_by': recent_session['changed_by'],
+                            'description': f"Route-map collision: {next(iter(hits))} affects {session_name}"
+                        })
+                
+                # 3. BGP instance parameter conflict
+                # Check if hold_time or keepalive changed
+                # ... (expand as needed)
         
         return conflicts
     
-    def write_conflict_report(self, conflicts: List[Dict]):
+    def write_conflict_report(self, conflicts: List[Dict], now: Optional[datetime] = None):
         """Write detailed report for CI artifacts"""
         report = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': (now or datetime.now(timezone.utc)).isoformat(),
             'conflicts_found': len(conflicts) > 0,
             'conflict_count': len(conflicts),
             'conflicts': conflicts,
@@ -280,8 +471,8 @@ class BGPConflictDetector:
             }
         }
         
-        with open('conflict-report.json', 'w') as f:
-            json.dump(report, f, indent=2)
+        with open('conflict-report.json', 'wb') as f:
+            f.write(dumps(report))
         
         # GitLab CI artifact format
         with open('conflict-report.env', 'w') as f:
@@ -304,22 +495,27 @@ class BGPConflictDetector:
         if not conflicts:
             return
         
-        comment = "**BGP Conflict Detected**\\n\\n"
-        comment += "The following BGP resources have been modified recently:\\n\\n"
+        parts = [
+            "**BGP Conflict Detected**\\n\\n",
+            "The following BGP resources have been modified recently:\\n\\n",
+        ]
         
         for c in conflicts:
             severity_label = "[HIGH]" if c['severity'] == 'HIGH' else "[MEDIUM]"
-            comment += f"{severity_label} **{c['type'].replace('_', ' ').title()}**\\n"
-            comment += f"- **Device:** `{c['device']}`\\n"
-            comment += f"- **Session:** `{c['session']}`\\n"
-            comment += f"- **Peer IP:** `{c['peer_ip']}`\\n"
-            comment += f"- **Changed by:** `{c['changed_by']}` at {c['changed_at']}\\n"
-            comment += f"- **Description:** {c['description']}\\n\\n"
+            parts.append(
+                f"{severity_label} **{c['type'].replace('_', ' ').title()}**\\n"
+                f"- **Device:** `{c['device']}`\\n"
+                f"- **Session:** `{c['session']}`\\n"
+                f"- **Peer IP:** `{c['peer_ip']}`\\n"
+                f"- **Changed by:** `{c['changed_by']}` at {c['changed_at']}\\n"
+                f"- **Description:** {c['description']}\\n\\n"
+            )
         
-        comment += "**Action Required:** Please coordinate with the other engineer before merging."
+        parts.append("**Action Required:** Please coordinate with the other engineer before merging.")
+        comment = "".join(parts)
         
         try:
-            response = httpx.post(
+            response = self._http.post(
                 f"https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_id}/notes",
                 headers={"PRIVATE-TOKEN": gitlab_token},
                 json={"body": comment}
@@ -349,42 +545,40 @@ def main():
     
     print(f"Analyzing {len(args.diff_files.split())} changed files...")
     
-    detector = BGPConflictDetector(args.infrahub_url, args.infrahub_token)
+    with BGPConflictDetector(args.infrahub_url, args.infrahub_token) as detector:
+        # Single clock read shared by the query window and the report timestamp
+        run_started = datetime.now(timezone.utc)
     
-    # 1. Extract BGP changes from Git
-    git_changes = detector.extract_bgp_changes_from_git(args.diff_files)
+        # 1. Extract BGP changes from Git
+        git_changes = detector.extract_bgp_changes_from_git(args.diff_files)
     
-    if not git_changes:
-        print("No BGP-related changes detected.")
-        sys.exit(0)
+        if not git_changes:
+            print("No BGP-related changes detected.")
+            sys.exit(0)
     
-    print(f"Found BGP changes for devices: {list(git_changes.keys())}")
+        print(f"Found BGP changes for devices: {list(git_changes.keys())}")
     
-    # 2. Get recent BGP changes from Infrahub
-    recent_sessions = detector.get_recent_bgp_changes_graphql(args.window_minutes)
+        # 2. Get recent BGP changes from Infrahub
+        recent_sessions = detector.get_recent_bgp_changes_graphql(args.window_minutes, now=run_started)
     
-    # 3. Detect conflicts
-    conflicts = detector.detect_conflicts(git_changes, recent_sessions)
+        # 3. Detect conflicts
+        conflicts = detector.detect_conflicts(git_changes, recent_sessions, now=run_started)
     
-    # 4. Write report
-    report = detector.write_conflict_report(conflicts)
+        # 4. Write report (conflict-report.json and conflict-report.env)
+        detector.write_conflict_report(conflicts, now=run_started)
     
-    if conflicts:
-        print(f"ERROR: {len(conflicts)} conflicts detected!")
-        for c in conflicts:
-            print(json.dumps(c, indent=2))
+        if conflicts:
+            print(f"ERROR: {len(conflicts)} conflicts detected!")
+            for c in conflicts:
+                print(dumps(c).decode())
         
-        # Post GitLab comment
-        detector.post_mr_comment(conflicts)
+            # Post GitLab comment
+            detector.post_mr_comment(conflicts)
         
-        # Save report
-        with open('conflict-report.json', 'w') as f:
-            json.dump(report, f, indent=2)
-        
-        sys.exit(1)
+            sys.exit(1)
     
-    print("No BGP conflicts detected. Safe to merge.")
-    sys.exit(0)
+        print("No BGP conflicts detected. Safe to merge.")
+        sys.exit(0)
 
 if __name__ == "__main__":
     main()
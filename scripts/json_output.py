@@ -0,0 +1,15 @@
+"""JSON serialisation shared by the BGP conflict scripts"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    """Serialise obj as indented JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC)
+    return json.dumps(obj, indent=2, default=str).encode()
@@ -3,43 +3,73 @@
 Load comprehensive BGP test data into Infrahub
 """
 
+import asyncio
 import os
 import sys
 import time
 import httpx
-from infrahub_sdk import InfrahubClientSync
+from infrahub_sdk import InfrahubClient
 
 INFRAHUB_URL = os.getenv("INFRAHUB_URL", "http://localhost:8000")
 TOKEN = os.getenv("INFRAHUB_TOKEN", "18795e9c-b6db-fbff-cf87-10652e494a9a")
 
+# Maximum number of Infrahub create/save requests in flight at once
+MAX_CONCURRENT_REQUESTS = 8
+
+# Readiness polling: exponential backoff from 100ms up to 2s, 60s overall
+READY_TIMEOUT_SECONDS = 60
+READY_INITIAL_DELAY = 0.1
+READY_MAX_DELAY = 2.0
+
 def wait_for_infrahub():
     """Wait for Infrahub to be ready"""
     print("Waiting for Infrahub to be ready...")
-    client = httpx.Client(timeout=5.0)
-    for i in range(30):
-        try:
-            response = client.get(f"{INFRAHUB_URL}/api/info")
-            if response.status_code == 200:
-                print("Infrahub is ready!")
-                return True
-        except httpx.RequestError as e:
-            print(f"Connection attempt {i+1}/30 failed: {e}")
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-        time.sleep(2)
-    print("ERROR: Infrahub not ready after 60 seconds")
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    delay = READY_INITIAL_DELAY
+    attempt = 0
+    transport = httpx.HTTPTransport(retries=2)
+    with httpx.Client(timeout=1.0, transport=transport) as client:
+        while True:
+            attempt += 1
+            try:
+                response = client.get(f"{INFRAHUB_URL}/api/info")
+                if response.status_code == 200:
+                    print("Infrahub is ready!")
+                    return True
+            except httpx.RequestError as e:
+                print(f"Connection attempt {attempt} failed: {e}")
+            except Exception as e:
+                print(f"Unexpected error: {e}")
+            if time.monotonic() + delay > deadline:
+                break
+            time.sleep(delay)
+            delay = min(delay * 1.7, READY_MAX_DELAY)
+    print(f"ERROR: Infrahub not ready after {READY_TIMEOUT_SECONDS} seconds")
     sys.exit(1)
 
-def load_test_data():
+async def create_objects(client, semaphore, kind, items):
+    """Create and save Infrahub objects concurrently; failed items yield their exception"""
+    async def create(data):
+        async with semaphore:
+            obj = await client.create(kind=kind, data=data)
+            await obj.save()
+            return obj
+    
+    return await asyncio.gather(*(create(data) for data in items), return_exceptions=True)
+
+async def create_all():
     """Load comprehensive BGP test data"""
-    client = InfrahubClientSync(address=INFRAHUB_URL, token=TOKEN)
+    client = InfrahubClient(address=INFRAHUB_URL, token=TOKEN)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
     
     print("Cleaning old test data...")
     try:
         # Clean up any existing test data
-        for device in client.filters(kind="InfraDevice", name__value="router*"):
-            if device.name.startswith(("router01", "router02", "router03")):
-                device.delete()
+        old_devices = [
+            device for device in await client.filters(kind="InfraDevice", name__value="router*")
+            if device.name.startswith(("router01", "router02", "router03"))
+        ]
+        await asyncio.gather(*(device.delete() for device in old_devices))
     except Exception as e:
         print(f"WARNING: Failed to clean old test data: {e}")
         # Continue anyway
@@ -72,32 +102,32 @@ def load_test_data():
     ]
     
     device_objs = {}
-    for dev_data in devices:
-        try:
-            device = client.create(kind="InfraDevice", data=dev_data)
-            device.save()
-            device_objs[dev_data['name']] = device
+    results = await create_objects(client, semaphore, "InfraDevice", devices)
+    for dev_data, result in zip(devices, results):
+        if isinstance(result, Exception):
+            print(f"WARNING: Failed to create {dev_data['name']}: {result}")
+        else:
+            device_objs[dev_data['name']] = result
             print(f"Created device: {dev_data['name']}")
-        except Exception as e:
-            print(f"WARNING: Failed to create {dev_data['name']}: {e}")
     
-    # Create BGP instances
+    # Create BGP instances (need the device ids)
+    instances = [
+        {
+            "name": f"bgp_{name}",
+            "asn": 65000 if name == "router01" else 65001 if name == "router02" else 65002,
+            "device": device.id
+        }
+        for name, device in device_objs.items()
+    ]
+    
     bgp_instances = {}
-    for name, device in device_objs.items():
-        try:
-            instance = client.create(
-                kind="NetworkBGPInstance",
-                data={
-                    "name": f"bgp_{name}",
-                    "asn": 65000 if name == "router01" else 65001 if name == "router02" else 65002,
-                    "device": device.id
-                }
-            )
-            instance.save()
-            bgp_instances[name] = instance
+    results = await create_objects(client, semaphore, "NetworkBGPInstance", instances)
+    for name, result in zip(device_objs, results):
+        if isinstance(result, Exception):
+            print(f"WARNING: Failed to create BGP instance for {name}: {result}")
+        else:
+            bgp_instances[name] = result
             print(f"Created BGP instance for {name}")
-        except Exception as e:
-            print(f"WARNING: Failed to create BGP instance for {name}: {e}")
     
     # Create BGP sessions
     sessions = [
@@ -130,16 +160,12 @@ def load_test_data():
         }
     ]
     
-    for session_data in sessions:
-        try:
-            session = client.create(
-                kind="NetworkBGPSession",
-                data=session_data
-            )
-            session.save()
+    results = await create_objects(client, semaphore, "NetworkBGPSession", sessions)
+    for session_data, result in zip(sessions, results):
+        if isinstance(result, Exception):
+            print(f"WARNING: Failed to create session {session_data['name']}: {result}")
+        else:
             print(f"Created BGP session: {session_data['name']}")
-        except Exception as e:
-            print(f"WARNING: Failed to create session {session_data['name']}: {e}")
     
     print("Test data loaded successfully!")
     print("\nAvailable test devices:")
@@ -147,6 +173,10 @@ def load_test_data():
         print(f"   - {name}")
     print("\nReady to run conflict detection tests!")
 
+def load_test_data():
+    """Load comprehensive BGP test data"""
+    asyncio.run(create_all())
+
 if __name__ == "__main__":
     wait_for_infrahub()
     load_test_data()
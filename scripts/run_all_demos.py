@@ -3,81 +3,131 @@
 
 import os
 import sys
-import json
 import subprocess
 import time
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Optional
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from scripts.detect_bgp_conflicts import BGPConflictDetector
+from scripts.json_output import dumps
 
 # Configuration
 INFRAHUB_URL = os.getenv("INFRAHUB_URL", "http://localhost:8000")
 INFRAHUB_TOKEN = os.getenv("INFRAHUB_TOKEN", "18795e9c-b6db-fbff-cf87-10652e494a9a")
 
+# libyaml-backed dumper when PyYAML was built with it
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
 class Demos:
     def __init__(self):
         self.detector = BGPConflictDetector(INFRAHUB_URL, INFRAHUB_TOKEN)
         self.results = []
     
-    def run_scenario(self, name: str, setup_func, expected_conflicts: int):
-        """Run a single test scenario"""
-        print(f"\n{'='*60}")
-        print(f"SCENARIO: {name}")
-        print(f"{'='*60}")
+    def run_scenario(self, name: str, setup_func, expected_conflicts: int,
+                     clock_skew: timedelta = timedelta(0), expected_without_skew: Optional[int] = None):
+        """
+        Run a single test scenario
+        clock_skew moves the end of the detection window forward, so time-window
+        scenarios age their Infrahub changes without waiting. A skewed window lies
+        partly in the future, so expected_without_skew also checks the change is
+        detected at the real time before checking it is ignored once aged
+        """
+        self._print_header(name)
         
         try:
             # Setup
             print("Setting up scenario...")
-            setup_func()
+            diff_files = setup_func()
             
             # Wait a moment for changes to register
             time.sleep(2)
             
-            # Extract Git changes
-            git_changes = self.detector.extract_bgp_changes_from_git(
-                os.getenv('GIT_DIFF_FILES', '')
-            )
-            
-            # Get recent Infrahub changes
-            recent_sessions = self.detector.get_recent_bgp_changes_graphql(5)
-            
-            # Detect conflicts
-            conflicts = self.detector.detect_conflicts(git_changes, recent_sessions)
-            
-            # Check results
-            success = len(conflicts) == expected_conflicts
-            self.results.append({
-                'name': name,
-                'status': 'PASS' if success else 'FAIL',
-                'expected': expected_conflicts,
-                'found': len(conflicts),
-                'conflicts': conflicts
-            })
-            
-            print(f"Expected {expected_conflicts} conflicts, found {len(conflicts)}")
-            
-            if conflicts:
-                print("\nConflicts detected:")
-                for c in conflicts:
-                    print(json.dumps(c, indent=2))
-            
-            return success
+            if expected_without_skew is not None:
+                if not self._check_scenario(f"{name} (in window)", diff_files, expected_without_skew):
+                    return False
+            return self._check_scenario(name, diff_files, expected_conflicts, clock_skew)
             
         except Exception as e:
-            print(f"ERROR: Scenario failed: {e}")
-            import traceback
-            traceback.print_exc()
-            self.results.append({
-                'name': name,
-                'status': 'ERROR',
-                'error': str(e)
-            })
+            self._record_error(name, e)
             return False
     
+    def run_scenarios(self, scenarios, max_workers: int = 4):
+        """
+        Run independent scenarios: setups run concurrently, then each is checked in order
+        scenarios: list of (name, setup_func, expected_conflicts); the setups must
+        write different files and modify different Infrahub sessions
+        """
+        print(f"\nSetting up {len(scenarios)} scenarios concurrently...")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(setup_func) for _, setup_func, _ in scenarios]
+        
+        # One wait for all changes to register
+        time.sleep(2)
+        
+        outcomes = []
+        for (name, _, expected_conflicts), future in zip(scenarios, futures):
+            self._print_header(name)
+            try:
+                outcomes.append(self._check_scenario(name, future.result(), expected_conflicts))
+            except Exception as e:
+                self._record_error(name, e)
+                outcomes.append(False)
+        return outcomes
+    
+    def _print_header(self, name: str):
+        print(f"\n{'='*60}")
+        print(f"SCENARIO: {name}")
+        print(f"{'='*60}")
+    
+    def _check_scenario(self, name: str, diff_files: str, expected_conflicts: int,
+                        clock_skew: timedelta = timedelta(0)) -> bool:
+        """Detect conflicts for a scenario whose setup has run and record the result"""
+        # Extract Git changes
+        git_changes = self.detector.extract_bgp_changes_from_git(diff_files)
+        
+        # Get recent Infrahub changes
+        now = datetime.now(timezone.utc) + clock_skew
+        recent_sessions = self.detector.get_recent_bgp_changes_graphql(5, now=now)
+        
+        # Detect conflicts
+        conflicts = self.detector.detect_conflicts(git_changes, recent_sessions, now=now)
+        
+        # Check results
+        success = len(conflicts) == expected_conflicts
+        self.results.append({
+            'name': name,
+            'status': 'PASS' if success else 'FAIL',
+            'expected': expected_conflicts,
+            'found': len(conflicts),
+            'conflicts': conflicts
+        })
+        
+        print(f"Expected {expected_conflicts} conflicts, found {len(conflicts)}")
+        
+        if conflicts:
+            print("\nConflicts detected:")
+            for c in conflicts:
+                print(dumps(c).decode())
+        
+        return success
+    
+    def _record_error(self, name: str, e: Exception):
+        print(f"ERROR: Scenario failed: {e}")
+        import traceback
+        traceback.print_exc()
+        self.results.append({
+            'name': name,
+            'status': 'ERROR',
+            'error': str(e)
+        })
+    
     def scenario_1_concurrent_asn_change(self):
         """Two engineers change same peer ASN"""
         # Git change (Engineer A)
@@ -92,13 +142,13 @@ class Demos:
                     'peer_asn': 65099,  # Changed
                     'route_map_in': 'RM_FROM_ROUTER02_IN'
                 }]
-            }, f)
-        
-        os.environ['GIT_DIFF_FILES'] = config_path
+            }, f, Dumper=YAML_DUMPER)
         
         # Infrahub change (Engineer B)
         from scripts.simulate_concurrent_change import simulate_change
         simulate_change('router01_192.168.1.2', 'peer_asn', 65100)
+        
+        return config_path
     
     def scenario_2_route_map_collision(self):
         """Route-map change affects multiple peers"""
@@ -110,24 +160,23 @@ class Demos:
             yaml.dump({
                 'name': 'RM_FROM_ROUTER02_IN',
                 'entries': [{'seq': 10, 'action': 'permit', 'set_local_pref': 200}]
-            }, f)
-        
-        os.environ['GIT_DIFF_FILES'] = config_path
+            }, f, Dumper=YAML_DUMPER)
         
         # Infrahub change to BGP session using this route-map
         from scripts.simulate_concurrent_change import simulate_change
         simulate_change('router02_192.168.1.1', 'route_map_in', 'RM_FROM_ROUTER02_IN')
+        
+        return config_path
     
     def scenario_3_false_positive_old_change(self):
-        """Old change (>5 min) should NOT trigger conflict"""
-        # Make change 6 minutes ago
+        """
+        Old change (>5 min) should NOT trigger conflict
+        The change is detected at the real time, then ignored with a clock_skew of
+        6 minutes that puts it outside the window
+        """
         from scripts.simulate_concurrent_change import simulate_change
         simulate_change('router01_192.168.1.2', 'state', 'down')
         
-        # Wait 6 minutes
-        print("Waiting 6 minutes to test time window...")
-        time.sleep(360)
-        
         # Now make Git change
         config_path = "configs/bgp/routers/router01.yaml"
         with open(config_path, 'w') as f:
@@ -138,9 +187,9 @@ class Demos:
                     'peer_asn': 65001,
                     'hold_time': 180
                 }]
-            }, f)
+            }, f, Dumper=YAML_DUMPER)
         
-        os.environ['GIT_DIFF_FILES'] = config_path
+        return config_path
     
     def scenario_4_multi_device_conflict(self):
         """Network-wide change conflicts with device-specific"""
@@ -152,13 +201,13 @@ class Demos:
                 'global': {
                     'bgp_hold_time': 240  # Global default
                 }
-            }, f)
-        
-        os.environ['GIT_DIFF_FILES'] = config_path
+            }, f, Dumper=YAML_DUMPER)
         
         # Device-specific change in Infrahub
         from scripts.simulate_concurrent_change import simulate_change
         simulate_change('router01_192.168.1.2', 'hold_time', 120)
+        
+        return config_path
     
     def scenario_5_flapping_detection(self):
         """Flapping BGP session should block changes"""
@@ -182,10 +231,11 @@ class Demos:
                     'peer_asn': 65001,
                     'keepalive': 30
                 }]
-            }, f)
+            }, f, Dumper=YAML_DUMPER)
         
-        os.environ['GIT_DIFF_FILES'] = config_path
         thread.join()
+        
+        return config_path
     
     def print_summary(self):
         """Print test results summary"""
@@ -223,26 +273,23 @@ def main():
     print("\nLoading test data...")
     subprocess.run([sys.executable, "scripts/load_test_data.py"], check=True)
     
-    # Run scenarios
-    demos.run_scenario(
-        "Concurrent ASN Change",
-        demos.scenario_1_concurrent_asn_change,
-        expected_conflicts=1
-    )
+    # Run scenarios; 1 and 2 modify different sessions, so their setups run concurrently.
+    # 4 modifies the same session as 1 and 5 flaps it, so those stay serial
+    demos.run_scenarios([
+        ("Concurrent ASN Change", demos.scenario_1_concurrent_asn_change, 1),
+        ("Route Map Collision", demos.scenario_2_route_map_collision, 1),
+    ])
     
+    # Detection runs 6 minutes ahead instead of sleeping, so this stays quick;
+    # the same change must first be caught inside the real window
     demos.run_scenario(
-        "Route Map Collision",
-        demos.scenario_2_route_map_collision,
-        expected_conflicts=1
+        "False Positive (Old Change)",
+        demos.scenario_3_false_positive_old_change,
+        expected_conflicts=0,
+        clock_skew=timedelta(minutes=6),
+        expected_without_skew=1
     )
     
-    # Skip time-based test in quick mode
-    # demos.run_scenario(
-    #     "False Positive (Old Change)",
-    #     demos.scenario_3_false_positive_old_change,
-    #     expected_conflicts=0
-    # )
-    
     demos.run_scenario(
         "Multi-Device Policy Conflict",
         demos.scenario_4_multi_device_conflict,
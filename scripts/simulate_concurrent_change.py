@@ -3,51 +3,157 @@
 
 import os
 import sys
+import atexit
+import time
 import argparse
+import functools
+import httpx
 try:
-    from infrahub_sdk import InfrahubClientSync
+    from infrahub_sdk import Config, InfrahubClientSync
 except ImportError:
     print("ERROR: infrahub_sdk not installed. Install with: pip install infrahub-sdk")
     sys.exit(1)
 
-def simulate_change(session_name: str, field: str, value, infrahub_url: str = None, token: str = None):
-    """Simulate a change to a BGP session"""
+# Keep-alive pool shared by every Infrahub request from this module; the SDK's
+# default requester opens a new connection (and TLS handshake) per request
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=20, keepalive_expiry=60)
+_http = httpx.Client(transport=httpx.HTTPTransport(retries=0, limits=HTTP_LIMITS))
+atexit.register(_http.close)
+
+def pooled_request(url: str, method, headers: dict, timeout: int, payload: dict = None) -> httpx.Response:
+    """InfrahubClientSync requester that sends over the shared keep-alive pool"""
+    return _http.request(method.value, url, headers=headers, timeout=timeout, json=payload)
+
+@functools.lru_cache(maxsize=4)
+def get_client(infrahub_url: str, token: str):
+    """InfrahubClientSync for an address and token, created once per process"""
+    return InfrahubClientSync(
+        address=infrahub_url, token=token, config=Config(sync_requester=pooled_request)
+    )
+
+# Session ids are reused for a short time, so repeated changes to the same session
+# in one run (run_all_demos changes router01 several times) skip the filter query.
+# Only the id is cached, never the SDK node: changes are sent by id, so concurrent
+# callers cannot write back each other's stale attributes
+LOOKUP_TTL_SECONDS = 60
+_session_ids = {}
+
+def find_session_id(client, session_name: str):
+    """Return the id of the NetworkBGPSession called session_name, or None; ids are cached per client"""
+    key = (client, session_name)
+    cached = _session_ids.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    
+    sessions = client.filters(kind="NetworkBGPSession", name__value=session_name)
+    if not sessions:
+        return None
+    _session_ids[key] = (time.monotonic() + LOOKUP_TTL_SECONDS, sessions[0].id)
+    return sessions[0].id
+
+# One fixed document for any attribute; the server coerces data.<field>.value to
+# the attribute's type, so values travel as typed variables rather than literals
+UPDATE_MUTATION = """
+mutation UpdateBGPSession($data: NetworkBGPSessionUpdateInput!) {
+    NetworkBGPSessionUpdate(data: $data) {
+        ok
+    }
+}
+"""
+
+# NetworkBGPSession attributes of kind Number (schemas/bgp.yml)
+NUMBER_FIELDS = frozenset({"peer_asn", "hold_time", "keepalive"})
+
+def update_variables(session_id: str, field: str, value) -> dict:
+    """Variables for UPDATE_MUTATION; numeric strings (as given on the CLI) are sent as numbers for Number fields"""
+    if field in NUMBER_FIELDS and isinstance(value, str):
+        value = int(value)
+    return {"data": {"id": session_id, field: {"value": value}}}
+
+@functools.lru_cache(maxsize=16)
+def value_query(field: str) -> str:
+    """Query reading one attribute of a session by id, built once per field"""
+    return f"""
+query BGPSessionValue($id: ID!) {{
+    NetworkBGPSession(ids: [$id]) {{
+        edges {{
+            node {{
+                {field} {{
+                    value
+                }}
+            }}
+        }}
+    }}
+}}
+"""
+
+def apply_change(client, session_id: str, field: str, value):
+    """Update one attribute of a session by id and return its previous value"""
+    result = client.execute_graphql(query=value_query(field), variables={"id": session_id})
+    edges = result["NetworkBGPSession"]["edges"]
+    if not edges:
+        raise LookupError(f"NetworkBGPSession {session_id} not found")
+    old_value = edges[0]["node"][field]["value"]
+    client.execute_graphql(query=UPDATE_MUTATION, variables=update_variables(session_id, field, value))
+    return old_value
+
+def simulate_change(session_name: str, field: str, value, infrahub_url: str = None, token: str = None,
+                    session_id: str = None):
+    """
+    Simulate a change to a BGP session
+    The update is sent by id; with session_id it skips the lookup by session_name
+    The previous value is read by id just before the update, for the output line
+    """
     if infrahub_url is None:
         infrahub_url = os.getenv("INFRAHUB_URL", "http://localhost:8000")
     if token is None:
         token = os.getenv("INFRAHUB_TOKEN", "18795e9c-b6db-fbff-cf87-10652e494a9a")
     
     try:
-        client = InfrahubClientSync(address=infrahub_url, token=token)
+        client = get_client(infrahub_url, token)
     except Exception as e:
         print(f"ERROR: Failed to connect to Infrahub at {infrahub_url}: {e}")
         sys.exit(1)
     
     try:
-        sessions = client.filters(kind="NetworkBGPSession", name__value=session_name)
-        
-        if not sessions:
-            print(f"ERROR: Session {session_name} not found")
-            sys.exit(1)
+        if session_id is not None:
+            old_value = apply_change(client, session_id, field, value)
+        else:
+            session_id = find_session_id(client, session_name)
+            if session_id is None:
+                print(f"ERROR: Session {session_name} not found")
+                sys.exit(1)
+            try:
+                old_value = apply_change(client, session_id, field, value)
+            except Exception:
+                # The cached id may be stale; look it up again and retry once
+                _session_ids.pop((client, session_name), None)
+                session_id = find_session_id(client, session_name)
+                if session_id is None:
+                    print(f"ERROR: Session {session_name} not found")
+                    sys.exit(1)
+                old_value = apply_change(client, session_id, field, value)
         
-        session = sessions[0]
-        old_value = getattr(session, field, None)
-        setattr(session, field, value)
-        session.save()
-        
-        print(f"Simulated: {session_name}.{field} = {value} (was: {old_value})")
+        print(f"Simulated: {session_name or session_id}.{field} = {value} (was: {old_value})")
     except Exception as e:
         print(f"ERROR: Failed to simulate change: {e}")
         sys.exit(1)
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--session', required=True)
+def _build_parser():
+    """Command-line parser, built once when the module is loaded"""
+    parser = argparse.ArgumentParser(description='Simulate a concurrent change to a BGP session')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--session', help='Session name, looked up before the change')
+    target.add_argument('--id', help='Session id; the change is sent without a lookup')
     parser.add_argument('--field', required=True)
     parser.add_argument('--value', required=True)
     parser.add_argument('--infrahub-url', default=None, help='Defaults to INFRAHUB_URL env var or http://localhost:8000')
     parser.add_argument('--token', default=None, help='Defaults to INFRAHUB_TOKEN env var')
-    
-    args = parser.parse_args()
-    simulate_change(args.session, args.field, args.value, args.infrahub_url, args.token)
+    return parser
+
+_PARSER = _build_parser()
+
+if __name__ == "__main__":
+    args = _PARSER.parse_args()
+    simulate_change(args.session, args.field, args.value, args.infrahub_url, args.token, session_id=args.id)
 
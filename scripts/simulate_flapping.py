@@ -1,51 +1,130 @@
 #!/usr/bin/env python3
 """Simulate BGP session flapping"""
 
+import asyncio
 import os
 import sys
-import time
 import argparse
+import httpx
 try:
-    from infrahub_sdk import InfrahubClientSync
+    from infrahub_sdk import Config, InfrahubClient
 except ImportError:
     print("ERROR: infrahub_sdk not installed. Install with: pip install infrahub-sdk")
     sys.exit(1)
 
-def simulate_flapping(session_name: str, flap_count: int = 5, interval: float = 2.0, infrahub_url: str = None, token: str = None):
-    """Simulate BGP session flapping by toggling state"""
-    if infrahub_url is None:
-        infrahub_url = os.getenv("INFRAHUB_URL", "http://localhost:8000")
-    if token is None:
-        token = os.getenv("INFRAHUB_TOKEN", "18795e9c-b6db-fbff-cf87-10652e494a9a")
+# Keep-alive pool shared by every Infrahub request of a simulation run; the SDK's
+# default requester opens a new connection (and TLS handshake) per request
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=20, keepalive_expiry=60)
+
+# Seconds between flaps. A failed save is retried after a capped exponential
+# backoff (interval * 2**attempt, at most the maximum), so a slow or erroring
+# server is polled less often instead of being hit at the flap rate
+DEFAULT_INTERVAL = 0.5
+DEFAULT_INTERVAL_MAX = 8.0
+MAX_FLAP_RETRIES = 5
+
+# Flaps send this fixed document by session id instead of letting node.save()
+# rebuild an update mutation from the whole node every time
+FLAP_MUTATION = """
+mutation FlapBGPSession($id: String!, $state: String!) {
+    NetworkBGPSessionUpdate(data: {id: $id, state: {value: $state}}) {
+        ok
+    }
+}
+"""
+
+def pooled_config(http: httpx.AsyncClient) -> Config:
+    """Client config whose requester sends over the given keep-alive pool"""
+    async def pooled_request(url: str, method, headers: dict, timeout: int, payload: dict = None) -> httpx.Response:
+        return await http.request(method.value, url, headers=headers, timeout=timeout, json=payload)
     
+    return Config(requester=pooled_request)
+
+async def find_session(client, session_name: str):
+    """Return the NetworkBGPSession called session_name, or None"""
+    sessions = await client.filters(kind="NetworkBGPSession", name__value=session_name)
+    return sessions[0] if sessions else None
+
+async def save_state(client, session_id: str, session_name: str, new_state: str) -> str:
+    """Set the session state, re-reading its id once if the update fails; returns the id used"""
     try:
-        client = InfrahubClientSync(address=infrahub_url, token=token)
-    except Exception as e:
-        print(f"ERROR: Failed to connect to Infrahub at {infrahub_url}: {e}")
-        sys.exit(1)
-    
+        await client.execute_graphql(query=FLAP_MUTATION, variables={"id": session_id, "state": new_state})
+    except Exception:
+        # The session may have been replaced since it was looked up; re-read it once and retry
+        session = await find_session(client, session_name)
+        if session is None:
+            raise LookupError(f"Session {session_name} not found")
+        session_id = session.id
+        await client.execute_graphql(query=FLAP_MUTATION, variables={"id": session_id, "state": new_state})
+    return session_id
+
+async def flap_session(client, session_name: str, flap_count: int, interval: float, interval_max: float):
+    """Toggle one session's state flap_count times, interval seconds apart"""
     print(f"Starting flapping simulation for {session_name} ({flap_count} flaps)")
     
+    # The session is looked up once; flaps only send the state change by id
     try:
-        for i in range(flap_count):
-            try:
-                sessions = client.filters(kind="NetworkBGPSession", name__value=session_name)
-                if not sessions:
-                    print(f"ERROR: Session {session_name} not found")
-                    return
-                
-                session = sessions[0]
-                new_state = "down" if i % 2 == 0 else "established"
-                session.state = new_state
-                session.save()
-                
-                print(f"  Flap {i+1}/{flap_count}: state -> {new_state}")
-                time.sleep(interval)
-            except Exception as e:
-                print(f"ERROR: Failed to flap session (iteration {i+1}): {e}")
+        session = await find_session(client, session_name)
+    except Exception as e:
+        print(f"ERROR: Failed to look up session {session_name}: {e}")
+        return
+    if session is None:
+        print(f"ERROR: Session {session_name} not found")
+        return
+    session_id = session.id
+    
+    i = 0
+    attempt = 0
+    while i < flap_count:
+        new_state = "down" if i % 2 == 0 else "established"
+        try:
+            # The save round-trip runs during the interval instead of adding to it
+            session_id, _ = await asyncio.gather(
+                save_state(client, session_id, session_name, new_state),
+                asyncio.sleep(interval),
+            )
+        except Exception as e:
+            attempt += 1
+            if attempt > MAX_FLAP_RETRIES:
+                print(f"ERROR: Failed to flap {session_name} (iteration {i+1}): {e}")
                 return
+            delay = min(interval * 2 ** attempt, interval_max)
+            print(f"WARNING: Flap {i+1} of {session_name} failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
         
-        print(f"Flapping simulation complete")
+        attempt = 0
+        print(f"  {session_name} flap {i+1}/{flap_count}: state -> {new_state}")
+        i += 1
+    
+    print(f"Flapping simulation complete for {session_name}")
+
+async def simulate_flapping_async(session_names: list, flap_count: int = 5, interval: float = DEFAULT_INTERVAL, infrahub_url: str = None, token: str = None,
+                                  interval_max: float = DEFAULT_INTERVAL_MAX):
+    """Flap several BGP sessions concurrently over one client and connection pool"""
+    if infrahub_url is None:
+        infrahub_url = os.getenv("INFRAHUB_URL", "http://localhost:8000")
+    if token is None:
+        token = os.getenv("INFRAHUB_TOKEN", "18795e9c-b6db-fbff-cf87-10652e494a9a")
+    
+    async with httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(retries=0, limits=HTTP_LIMITS)) as http:
+        try:
+            client = InfrahubClient(address=infrahub_url, token=token, config=pooled_config(http))
+        except Exception as e:
+            print(f"ERROR: Failed to connect to Infrahub at {infrahub_url}: {e}")
+            sys.exit(1)
+        
+        # Each distinct session is looked up (and flapped) once
+        await asyncio.gather(*(
+            flap_session(client, session_name, flap_count, interval, interval_max)
+            for session_name in dict.fromkeys(session_names)
+        ))
+
+def simulate_flapping(session_name: str, flap_count: int = 5, interval: float = DEFAULT_INTERVAL, infrahub_url: str = None, token: str = None,
+                      interval_max: float = DEFAULT_INTERVAL_MAX):
+    """Simulate BGP session flapping by toggling state"""
+    try:
+        asyncio.run(simulate_flapping_async([session_name], flap_count, interval, infrahub_url, token, interval_max))
     except KeyboardInterrupt:
         print("\nFlapping simulation interrupted by user")
         sys.exit(1)
@@ -53,14 +132,28 @@ def simulate_flapping(session_name: str, flap_count: int = 5, interval: float =
         print(f"ERROR: Unexpected error during flapping simulation: {e}")
         sys.exit(1)
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--session', required=True)
+def _build_parser():
+    """Command-line parser, built once when the module is loaded"""
+    parser = argparse.ArgumentParser(description='Simulate BGP session flapping')
+    sessions = parser.add_mutually_exclusive_group(required=True)
+    sessions.add_argument('--session', help='Session to flap')
+    sessions.add_argument('--sessions', help='Comma-separated sessions to flap concurrently')
     parser.add_argument('--flap-count', type=int, default=5)
-    parser.add_argument('--interval', type=float, default=2.0)
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help='Seconds between flaps')
+    parser.add_argument('--interval-max', type=float, default=DEFAULT_INTERVAL_MAX,
+                        help='Upper bound for the backoff after a failed save')
     parser.add_argument('--infrahub-url', default=None, help='Defaults to INFRAHUB_URL env var or http://localhost:8000')
     parser.add_argument('--token', default=None, help='Defaults to INFRAHUB_TOKEN env var')
-    
-    args = parser.parse_args()
-    simulate_flapping(args.session, args.flap_count, args.interval, args.infrahub_url, args.token)
+    return parser
 
+_PARSER = _build_parser()
+
+if __name__ == "__main__":
+    args = _PARSER.parse_args()
+    session_names = [args.session] if args.session else [name for name in args.sessions.split(',') if name]
+    try:
+        asyncio.run(simulate_flapping_async(session_names, args.flap_count, args.interval, args.infrahub_url, args.token,
+                                            args.interval_max))
+    except KeyboardInterrupt:
+        print("\nFlapping simulation interrupted by user")
+        sys.exit(1)
@@ -4,13 +4,28 @@ Validate BGP Conflict Detection System Setup
 Checks if all files exist and dependencies are available
 """
 
+import argparse
+import importlib.util
 import os
+import shutil
+import subprocess
 import sys
 from pathlib import Path
 
-def check_file_exists(filepath, description):
-    """Check if a file exists"""
-    exists = os.path.exists(filepath)
+def list_directory(dirpath):
+    """Names in a directory, or an empty set if it does not exist"""
+    try:
+        with os.scandir(dirpath or ".") as entries:
+            return {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+def check_file_exists(filepath, description, entries=None):
+    """Check if a file exists; entries may hold the names listed in its directory"""
+    if entries is None:
+        exists = os.path.exists(filepath)
+    else:
+        exists = os.path.basename(filepath) in entries
     status = "[OK]" if exists else "[MISSING]"
     print(f"{status} {description}: {filepath}")
     return exists
@@ -23,23 +38,60 @@ def check_directory_exists(dirpath, description):
     return exists
 
 def check_python_package(package_name):
-    """Check if a Python package is installed"""
-    try:
-        __import__(package_name)
+    """Check if a Python package is installed (located via find_spec, not imported)"""
+    if importlib.util.find_spec(package_name) is not None:
         print(f"[OK] Python package installed: {package_name}")
         return True
-    except ImportError:
-        print(f"[MISSING] Python package missing: {package_name}")
+    print(f"[MISSING] Python package missing: {package_name}")
+    return False
+
+def check_docker(show_version=False):
+    """
+    Check that the Docker CLI is on PATH
+    Only runs 'docker --version' (slow to start on Docker Desktop) when show_version is set
+    """
+    docker_path = shutil.which("docker")
+    if docker_path is None:
+        print("[ERROR] Docker not installed or not in PATH")
+        print("   Install Docker Desktop: https://www.docker.com/products/docker-desktop")
+        return False
+    
+    if not show_version:
+        print(f"[OK] Docker CLI found at: {docker_path}")
+        return True
+    
+    try:
+        result = subprocess.run([docker_path, "--version"],
+                              capture_output=True, text=True, timeout=5)
+    except subprocess.TimeoutExpired:
+        print("[ERROR] Docker not working properly")
         return False
+    if result.returncode == 0:
+        print(f"[OK] Docker installed: {result.stdout.strip()}")
+        return True
+    print("[ERROR] Docker not working properly")
+    return False
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Validate BGP Conflict Detection System Setup')
+    parser.add_argument('--fail-fast', '--fast', action='store_true',
+                        help='Stop at the first missing file, package or tool that the system cannot run without')
+    parser.add_argument('--docker-version', action='store_true',
+                        help="Run 'docker --version' instead of only locating the Docker CLI")
+    return parser.parse_args(argv)
+
+def fail_fast():
+    print("\n[ERROR] Stopping at the first critical failure (--fail-fast)")
+    return 1
+
+def main(argv=None):
+    args = parse_args(argv)
     print("Validating BGP Conflict Detection System Setup")
     print("=" * 60)
     
     all_good = True
     
     # Check core files
-    print("\nChecking core files...")
     files_to_check = [
         ("docker-compose.yml", "Docker Compose configuration"),
         (".gitlab-ci.yml", "GitLab CI configuration"),
@@ -48,12 +100,7 @@ def main():
         ("README.md", "README documentation"),
     ]
     
-    for filepath, desc in files_to_check:
-        if not check_file_exists(filepath, desc):
-            all_good = False
-    
     # Check scripts
-    print("\nChecking scripts...")
     scripts = [
         ("scripts/detect_bgp_conflicts.py", "Main conflict detection script"),
         ("scripts/load_test_data.py", "Test data loader"),
@@ -62,23 +109,35 @@ def main():
         ("scripts/simulate_flapping.py", "Flapping simulator"),
     ]
     
-    for filepath, desc in scripts:
-        if not check_file_exists(filepath, desc):
-            all_good = False
-    
     # Note: Conflict detection API is now part of bgp-orchestrator
     # No separate API service needed
     
     # Check config files
-    print("\nChecking configuration files...")
     config_files = [
         ("configs/bgp/routers/router01.yaml", "Router 01 config"),
         ("configs/bgp/routers/router02.yaml", "Router 02 config"),
     ]
     
-    for filepath, desc in config_files:
-        if not check_file_exists(filepath, desc):
-            all_good = False
+    # List each parent directory once instead of a stat per file,
+    # then report in the original order. The flag marks sections that --fail-fast
+    # stops on; the router configs are regenerated by the demos
+    sections = [
+        ("Checking core files...", files_to_check, True),
+        ("Checking scripts...", scripts, True),
+        ("Checking configuration files...", config_files, False),
+    ]
+    parents = list(dict.fromkeys(
+        os.path.dirname(filepath) for _, files, _ in sections for filepath, _ in files
+    ))
+    listings = {parent: list_directory(parent) for parent in parents}
+    
+    for title, files, critical in sections:
+        print(f"\n{title}")
+        for filepath, desc in files:
+            if not check_file_exists(filepath, desc, listings[os.path.dirname(filepath)]):
+                all_good = False
+                if args.fail_fast and critical:
+                    return fail_fast()
     
     # Check Python packages
     print("\nChecking Python packages...")
@@ -91,22 +150,15 @@ def main():
     for package in packages:
         if not check_python_package(package):
             all_good = False
+            if args.fail_fast:
+                return fail_fast()
     
     # Check for Docker
     print("\nChecking Docker...")
-    import subprocess
-    try:
-        result = subprocess.run(["docker", "--version"], 
-                              capture_output=True, text=True, timeout=5)
-        if result.returncode == 0:
-            print(f"[OK] Docker installed: {result.stdout.strip()}")
-        else:
-            print("[ERROR] Docker not working properly")
-            all_good = False
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        print("[ERROR] Docker not installed or not in PATH")
-        print("   Install Docker Desktop: https://www.docker.com/products/docker-desktop")
+    if not check_docker(args.docker_version):
         all_good = False
+        if args.fail_fast:
+            return fail_fast()
     
     # Summary
     print("\n" + "=" * 60)